@@ -0,0 +1,85 @@
+"""Import-time benchmark for the package and the CLI.
+
+Runs each scenario in a fresh interpreter, reports the median wall time and
+fails when a heavy dependency is imported eagerly or a time budget is
+exceeded.  Run from the repository root:
+
+    python benchmarks/import_time.py [--runs 5] [--budget-ms 300]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be loaded until a stage actually needs them
+HEAVY_MODULES = ["cv2", "fitz", "pptx", "openai", "PIL", "numpy"]
+
+SCENARIOS = {
+    "import src": "import src",
+    "import src.DocumentProcessor": "import src; src.DocumentProcessor",
+    "import src.service": "import src.service",
+}
+
+
+def _loaded_heavy_modules(code: str) -> list:
+    """Return the heavy modules present in sys.modules after running ``code``."""
+    probe = (
+        f"{code}\n"
+        "import json, sys\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _time_command(command: list, runs: int) -> float:
+    """Return the median wall time of ``command`` in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=300.0,
+                        help="maximum median time allowed per scenario")
+    args = parser.parse_args()
+
+    failures = []
+    baseline = _time_command([sys.executable, "-c", "pass"], args.runs)
+    print(f"{'interpreter startup':<32} {baseline:8.1f} ms")
+
+    commands = {name: [sys.executable, "-c", code] for name, code in SCENARIOS.items()}
+    commands["main.py --help"] = [sys.executable, "main.py", "--help"]
+
+    for name, command in commands.items():
+        elapsed = _time_command(command, args.runs)
+        print(f"{name:<32} {elapsed:8.1f} ms")
+        if elapsed > args.budget_ms:
+            failures.append(f"{name} took {elapsed:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    for name, code in SCENARIOS.items():
+        loaded = _loaded_heavy_modules(code)
+        if loaded:
+            failures.append(f"{name} eagerly imports {', '.join(loaded)}")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,72 @@
+import argparse
 import logging
-from src.document_processor import DocumentProcessor
-from src.content_analyzer import ContentAnalyzer
-from src.presentation_generator import PresentationGenerator
 import os
+from src.utils import parse_page_ranges, split_list
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert an academic paper (PDF) into a PowerPoint presentation.")
+    parser.add_argument("input_path", nargs="?", help="PDF path or URL (prompted for when omitted)")
+    parser.add_argument("--output-dir", default=os.getenv("OUTPUT_DIR", "output"),
+                        help="directory for the generated presentation and figures")
+    parser.add_argument("--raw-text", action="store_true",
+                        help="send the extracted text as-is, without removing headers, footers and references")
+    parser.add_argument("--backend", choices=["openai", "http", "fake"],
+                        help="LLM backend (default: $PDF2PPT_LLM_BACKEND or openai)")
+    parser.add_argument("--base-url", help="base URL of an OpenAI-compatible server (default: $PDF2PPT_LLM_BASE_URL)")
+    parser.add_argument("--pages", type=parse_page_ranges,
+                        help="only process these 1-based pages, e.g. 1-5,8,12-")
+    parser.add_argument("--sections", type=split_list,
+                        help="only generate slides for sections matching these comma-separated names")
+    parser.add_argument("--figures", type=split_list,
+                        help="only include these comma-separated figure numbers, e.g. 1,3")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+
+    # Heavy dependencies are imported only once there is work to do
+    from src.document_processor import DocumentProcessor
+    from src.llm_backends import create_backend
+    from src.presentation_generator import PresentationGenerator
+    from src.url_fetcher import document_name
+
     try:
         # Initialize components
-        document_processor = DocumentProcessor()
-        content_analyzer = ContentAnalyzer()
-        
+        document_processor = DocumentProcessor(
+            os.path.join(args.output_dir, "cache"),
+            normalize_text=not args.raw_text,
+            llm_backend=create_backend(args.backend, args.base_url),
+        )
+        content_analyzer = document_processor.content_analyzer
+
         # Get input path from user
-        input_path = input("Enter PDF path or URL: ")
-        
+        input_path = args.input_path or input("Enter PDF path or URL: ")
+
         # Create output path
-        output_dir = "output"
+        output_dir = args.output_dir
         os.makedirs(output_dir, exist_ok=True)
-        output_filename = os.path.splitext(os.path.basename(input_path))[0] + "_presentation.pptx"
+        output_filename = document_name(input_path) + "_presentation.pptx"
         output_path = os.path.join(output_dir, output_filename)
-        
+
         # Initialize presentation generator with output path
         presentation_generator = PresentationGenerator(output_path)
-        
-        # Process document
-        content, figures = document_processor.process_document(input_path)
-        
-        # Analyze content
-        analyzed_content = content_analyzer.analyze_content(content)
-        
-        # Generate presentation
-        presentation = presentation_generator.generate(analyzed_content, figures)
-        
+
+        # Extract text and figures
+        text_content, figures = document_processor.extract_document(
+            input_path, os.path.join(output_dir, "figures"), args.pages, args.figures
+        )
+
+        # Stream the analysis and render each section as soon as it is complete
+        title, sections = content_analyzer.analyze_content_stream(text_content, args.sections, args.figures)
+        presentation_generator.generate_stream(title, sections, figures)
+
         logger.info(f"Presentation generated successfully at {output_path}")
-        
+
     except Exception as e:
         logger.error(f"Error in main process: {str(e)}")
         raise
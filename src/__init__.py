@@ -1,11 +1,18 @@
-from .document_processor import DocumentProcessor
-from .content_analyzer import ContentAnalyzer
-from .figure_extractor import FigureExtractor
-from .presentation_generator import PresentationGenerator
-from .utils import get_logger, load_environment
+import importlib
 
 __version__ = "0.1.0"
 
+# Components are loaded on first attribute access so that importing the
+# package does not pull in cv2, fitz, pptx, openai, PIL or numpy.
+_LAZY_ATTRIBUTES = {
+    'DocumentProcessor': '.document_processor',
+    'ContentAnalyzer': '.content_analyzer',
+    'FigureExtractor': '.figure_extractor',
+    'PresentationGenerator': '.presentation_generator',
+    'get_logger': '.utils',
+    'load_environment': '.utils',
+}
+
 __all__ = [
     'DocumentProcessor',
     'ContentAnalyzer',
@@ -14,3 +21,16 @@ __all__ = [
     'get_logger',
     'load_environment',
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,15 +1,34 @@
 import logging
-from typing import Dict, Any
-import openai
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import json
+import queue
+import re
+import threading
+from src.json_stream import ArrayItemStreamParser
+from src.llm_backends import LLMBackend, create_backend, models_from_env
+from src.figure_index import FigureIndex, figure_key
+from src.schema import (is_truncated, loads_repaired, validate_analysis_section, validate_figure_contexts,
+                        validate_structure)
 import os
 
 logger = logging.getLogger(__name__)
 
 class ContentAnalyzer:
-    def __init__(self):
-        """Initialize content analyzer with OpenAI client."""
-        self.client = openai.OpenAI()
+    # Figures whose details are fetched together in one figure-context prompt
+    FIGURE_BATCH_SIZE = 8
+    # Sections re-requested together, so a re-request stays well under max_tokens
+    REANALYZE_BATCH_SIZE = 3
+
+    def __init__(self, backend: Optional[LLMBackend] = None, models: Optional[Dict[str, str]] = None):
+        """Initialize content analyzer with an LLM backend.
+
+        ``models`` maps the pipeline stages ("structure", "analysis",
+        "figures") to model names; unspecified stages are read from the
+        environment. The backend defaults to the one configured there.
+        """
+        self.backend = backend or create_backend()
+        self.models = models_from_env(models)
+        logger.debug(f"Model routing: {self.models}")
         
     def _clean_json_response(self, response: str) -> str:
         """Clean the JSON response by removing markdown code blocks and other formatting."""
@@ -20,238 +39,670 @@ class ContentAnalyzer:
         logger.debug(f"Original response: {response}")
         logger.debug(f"Cleaned response: {cleaned}")
         return cleaned
+
+    def _parse_json(self, raw_response: str, label: str) -> Any:
+        """Parse a model response, repairing fences, trailing commas and truncation locally."""
+        cleaned = self._clean_json_response(raw_response)
+        try:
+            return loads_repaired(cleaned)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse {label} JSON: {e}")
+            logger.error(f"Raw response: {raw_response}")
+            logger.error(f"Cleaned response: {cleaned}")
+            raise
         
-    def analyze_content(self, text_content: str) -> Dict[str, Any]:
-        """Analyze content with integrated section and figure analysis."""
+    def _analyze_structure(self, text_content: str) -> Dict[str, Any]:
+        """Extract the paper's section structure."""
+        structure_prompt = f"""
+        Analyze this academic paper and extract its exact structure.
+        Return ONLY the JSON structure with the following format:
+        {{
+            "title": "paper title",
+            "sections": [
+                {{
+                    "title": "section title",
+                    "content": [
+                        {{
+                            "subtitle": "subsection title",
+                            "points": ["point 1", "point 2"],
+                            "figures": ["Figure X"]
+                        }}
+                    ]
+                }}
+            ]
+        }}
+        
+        Paper text:
+        {text_content}
+        """
+
+        raw_structure = self.backend.chat(
+            model=self.models["structure"],
+            messages=[
+                {
+                    "role": "system", 
+                    "content": "You are a JSON generator. Return only valid JSON without any markdown formatting or additional text."
+                },
+                {"role": "user", "content": structure_prompt}
+            ],
+            temperature=0.1
+        )
+        
+        # Parse the response content
+        paper_structure = self._parse_json(raw_structure, "structure")
+        if not isinstance(paper_structure, dict):
+            raise ValueError(f"Structure response is not a JSON object: {raw_structure}")
+
+        errors = validate_structure(paper_structure)
+        if errors:
+            logger.warning(f"Structure response has {len(errors)} schema errors: {errors[:5]}")
+            # Keep what is usable; the structure only guides the analysis prompt
+            paper_structure.setdefault("title", "")
+            sections = paper_structure.get("sections")
+            paper_structure["sections"] = [
+                s for s in (sections if isinstance(sections, list) else [])
+                if isinstance(s, dict) and isinstance(s.get("title"), str)
+            ]
+        return paper_structure
+
+    def _content_request(self, paper_structure: Dict[str, Any], text_content: str,
+                         section_titles: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Build the chat completion arguments for the detailed content analysis.
+
+        When ``section_titles`` is given, only those sections are requested.
+        """
+        scope = ""
+        if section_titles:
+            paper_structure = dict(paper_structure, sections=[
+                s for s in paper_structure.get("sections", []) if s.get("title") in section_titles
+            ])
+            scope = "Analyze ONLY the following sections: " + "; ".join(section_titles)
+
+        content_prompt = f"""
+        Perform a comprehensive analysis of this academic paper. For each section:
+        {scope}
+
+        1. Section Overview:
+           - Main objective of the section
+           - Key concepts introduced
+           - Connection to overall paper narrative
+           - Critical findings or arguments
+
+        2. Detailed Content Analysis:
+           For each paragraph/subsection:
+           - Core argument or finding with specific numbers
+           - Supporting evidence and citations
+           - Technical details and methodology
+           - Connection to previous points
+           - Impact on subsequent arguments
+
+        3. Integrated Figure Analysis:
+           When analyzing figures in context:
+           - How the figure supports the current argument
+           - Specific data or results shown
+           - Technical details illustrated
+           - Connection to surrounding text
+           - Impact on conclusions
+
+        4. Technical Flow:
+           - Methodological progression
+           - Result dependencies
+           - Logical connections between sections
+           - Build-up of arguments
+           - Validation of claims
+
+        Return the analysis in this JSON format:
+        {{
+            "title": "paper title",
+            "sections": [
+                {{
+                    "title": "section title",
+                    "overview": "section's main points and role",
+                    "content": [
+                        {{
+                            "subtitle": "logical subsection title",
+                            "key_points": [
+                                {{
+                                    "argument": "main argument or finding",
+                                    "evidence": "supporting evidence with numbers",
+                                    "technical_details": "methodology or implementation",
+                                    "implications": "impact on overall narrative"
+                                }}
+                            ],
+                            "figures": [
+                                {{
+                                    "reference": "Figure X",
+                                    "description": "comprehensive description",
+                                    "technical_content": "methods and approach shown",
+                                    "results": "specific findings and measurements",
+                                    "integration": "how it supports the argument",
+                                    "panel_details": ["panel a details", "panel b details"]
+                                }}
+                            ]
+                        }}
+                    ]
+                }}
+            ]
+        }}
+
+        Guidelines for Analysis:
+        1. Maintain paper's logical flow
+        2. Include all quantitative details
+        3. Preserve technical accuracy
+        4. Show connections between sections
+        5. Integrate figures with main text
+        6. Highlight critical findings
+        7. Explain methodological choices
+
+        Paper structure:
+        {json.dumps(paper_structure, indent=2)}
+
+        Paper text:
+        {text_content}
+        """
+
+        return dict(
+            model=self.models["analysis"],
+            messages=[
+                {
+                    "role": "system", 
+                    "content": """You are an expert academic paper analyzer with deep technical knowledge. 
+                    Create a comprehensive analysis that maintains the paper's logical flow while integrating 
+                    detailed technical content, quantitative results, and figure descriptions. Focus on accuracy 
+                    and completeness."""
+                },
+                {"role": "user", "content": content_prompt}
+            ],
+            temperature=0.2,
+            max_tokens=4000,
+            json_mode=True
+        )
+
+    def _select_sections(self, paper_structure: Dict[str, Any], text_content: str,
+                         names: Optional[List[str]]) -> Tuple[Optional[List[str]], str]:
+        """
+        Resolve requested section names against the paper structure.
+        Returns the matching structure titles (None when everything is wanted)
+        and the part of the text covering only those sections.
+        """
+        if not names:
+            return None, text_content
+
+        titles = [s["title"] for s in paper_structure.get("sections", [])]
+        selected = [t for t in titles if any(name.lower() in t.lower() for name in names)]
+        if not selected:
+            raise ValueError(f"No sections match {names}; available sections: {titles}")
+        logger.info(f"Restricting analysis to sections: {', '.join(selected)}")
+        return selected, self._section_text(text_content, titles, selected)
+
+    def _section_text(self, text_content: str, titles: List[str], selected: List[str]) -> str:
+        """Cut the text of the selected sections out of the paper, using headings as boundaries."""
+        positions = []
+        search_from = 0
+        for title in titles:
+            heading = re.sub(r'^[\dIVX]+(?:\.\d+)*\.?\s+', '', title).strip()
+            match = re.compile(
+                r'^[ \t]*(?:[\dIVX]+(?:\.\d+)*\.?[ \t]+)?' + re.escape(heading) + r'[ \t]*$',
+                re.IGNORECASE | re.MULTILINE
+            ).search(text_content, search_from)
+            if match:
+                positions.append((title, match.start()))
+                search_from = match.end()
+            elif title in selected:
+                logger.warning(f"Heading '{title}' not found in text; sending the full text")
+                return text_content
+
+        spans = []
+        for i, (title, start) in enumerate(positions):
+            if title in selected:
+                end = positions[i + 1][1] if i + 1 < len(positions) else len(text_content)
+                spans.append(text_content[start:end])
+        return "\n\n".join(spans)
+
+    def _filter_figures(self, section: Dict[str, Any], figures: Optional[List[str]]):
+        """Keep only the figure entries whose reference is in the requested subset."""
+        if figures is None:
+            return
+        keys = {figure_key(f) for f in figures}
+        for item in section.get("content", []):
+            if "figures" in item:
+                item["figures"] = [f for f in item["figures"] if figure_key(f.get("reference", "")) in keys]
+
+    def analyze_content(self, text_content: str, sections: Optional[List[str]] = None,
+                        figures: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Analyze content with integrated section and figure analysis.
+
+        ``sections`` restricts the analysis to sections whose titles contain
+        one of the given names; ``figures`` keeps only those figure references.
+        """
         try:
             # Step 1: Extract paper structure
-            structure_prompt = f"""
-            Analyze this academic paper and extract its exact structure.
-            Return ONLY the JSON structure with the following format:
-            {{
-                "title": "paper title",
-                "sections": [
-                    {{
-                        "title": "section title",
-                        "content": [
-                            {{
-                                "subtitle": "subsection title",
-                                "points": ["point 1", "point 2"],
-                                "figures": ["Figure X"]
-                            }}
-                        ]
-                    }}
-                ]
-            }}
-            
-            Paper text:
-            {text_content}
-            """
-
-            structure_response = self.client.chat.completions.create(
-                model="gpt-4-1106-preview",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a JSON generator. Return only valid JSON without any markdown formatting or additional text."
-                    },
-                    {"role": "user", "content": structure_prompt}
-                ],
-                temperature=0.1
-            )
-            
-            # Get the response content and clean it
-            raw_structure = structure_response.choices[0].message.content
-            cleaned_structure = self._clean_json_response(raw_structure)
-            
-            try:
-                paper_structure = json.loads(cleaned_structure)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse structure JSON: {e}")
-                logger.error(f"Raw response: {raw_structure}")
-                logger.error(f"Cleaned response: {cleaned_structure}")
-                raise
-            
+            paper_structure = self._analyze_structure(text_content)
+            selected, scoped_text = self._select_sections(paper_structure, text_content, sections)
+
             # Step 2: Enhanced content analysis with integrated figure context
-            content_prompt = f"""
-            Perform a comprehensive analysis of this academic paper. For each section:
-
-            1. Section Overview:
-               - Main objective of the section
-               - Key concepts introduced
-               - Connection to overall paper narrative
-               - Critical findings or arguments
-
-            2. Detailed Content Analysis:
-               For each paragraph/subsection:
-               - Core argument or finding with specific numbers
-               - Supporting evidence and citations
-               - Technical details and methodology
-               - Connection to previous points
-               - Impact on subsequent arguments
-
-            3. Integrated Figure Analysis:
-               When analyzing figures in context:
-               - How the figure supports the current argument
-               - Specific data or results shown
-               - Technical details illustrated
-               - Connection to surrounding text
-               - Impact on conclusions
-
-            4. Technical Flow:
-               - Methodological progression
-               - Result dependencies
-               - Logical connections between sections
-               - Build-up of arguments
-               - Validation of claims
-
-            Return the analysis in this JSON format:
-            {{
-                "title": "paper title",
-                "sections": [
-                    {{
-                        "title": "section title",
-                        "overview": "section's main points and role",
-                        "content": [
-                            {{
-                                "subtitle": "logical subsection title",
-                                "key_points": [
-                                    {{
-                                        "argument": "main argument or finding",
-                                        "evidence": "supporting evidence with numbers",
-                                        "technical_details": "methodology or implementation",
-                                        "implications": "impact on overall narrative"
-                                    }}
-                                ],
-                                "figures": [
-                                    {{
-                                        "reference": "Figure X",
-                                        "description": "comprehensive description",
-                                        "technical_content": "methods and approach shown",
-                                        "results": "specific findings and measurements",
-                                        "integration": "how it supports the argument",
-                                        "panel_details": ["panel a details", "panel b details"]
-                                    }}
-                                ]
-                            }}
-                        ]
-                    }}
-                ]
-            }}
-
-            Guidelines for Analysis:
-            1. Maintain paper's logical flow
-            2. Include all quantitative details
-            3. Preserve technical accuracy
-            4. Show connections between sections
-            5. Integrate figures with main text
-            6. Highlight critical findings
-            7. Explain methodological choices
-
-            Paper structure:
-            {json.dumps(paper_structure, indent=2)}
-
-            Paper text:
-            {text_content}
-            """
-
-            content_response = self.client.chat.completions.create(
-                model="gpt-4-1106-preview",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": """You are an expert academic paper analyzer with deep technical knowledge. 
-                        Create a comprehensive analysis that maintains the paper's logical flow while integrating 
-                        detailed technical content, quantitative results, and figure descriptions. Focus on accuracy 
-                        and completeness."""
-                    },
-                    {"role": "user", "content": content_prompt}
-                ],
-                temperature=0.2,
-                max_tokens=4000,
-                response_format={"type": "json_object"}
+            content_response = self.backend.chat(**self._content_request(paper_structure, scoped_text, selected))
+
+            # Parse and validate the content, re-requesting only broken sections
+            analysis = self._parse_json(content_response, "analysis")
+            if not isinstance(analysis, dict):
+                analysis = {}
+            if not isinstance(analysis.get("title"), str):
+                analysis["title"] = paper_structure.get("title", "")
+            analysis["sections"] = self._validated_sections(
+                self._complete_sections(analysis, content_response), paper_structure, scoped_text, selected
             )
 
-            # Parse and return the content
-            return json.loads(content_response.choices[0].message.content)
+            # Fill in figure details from local context
+            for section in analysis["sections"]:
+                self._filter_figures(section, figures)
+            self._enrich_figures(analysis, FigureIndex(text_content))
+            return analysis
 
         except Exception as e:
             logger.error(f"Error analyzing content: {str(e)}")
             raise
 
-    def _extract_figure_context(self, text_content: str, figure_ref: str) -> Dict[str, Any]:
+    def analyze_content_stream(self, text_content: str, sections: Optional[List[str]] = None,
+                               figures: Optional[List[str]] = None) -> Tuple[str, Iterator[Dict[str, Any]]]:
         """
-        Extract comprehensive context for a figure by combining multiple sources of information.
-        Returns a structured dictionary with detailed figure information.
+        Analyze content with a streamed completion.
+        Returns the paper title and an iterator yielding each analyzed section as
+        soon as the model finishes it, so slides can be rendered while later
+        sections are still being generated. ``sections`` and ``figures`` select
+        a subset as in ``analyze_content``.
         """
         try:
-            context_prompt = f"""
-            Analyze {figure_ref} comprehensively using the following text. 
-            Provide a structured analysis including:
-
-            1. Caption and Basic Information:
-               - Full figure caption
-               - Figure type (graph, diagram, flowchart, etc.)
-               - Number of panels and their labels
-
-            2. Technical Content:
-               - Methodology or approach illustrated
-               - Key components and their relationships
-               - Technical parameters or conditions shown
-               - Data representation methods
-
-            3. Main Findings:
-               - Key results demonstrated
-               - Quantitative measurements
-               - Comparative analyses
-               - Statistical significance
-
-            4. Contextual Integration:
-               - How the figure supports main arguments
-               - References to the figure in main text
-               - Connection to other results
-               - Implications of findings
-
-            Return the analysis in this JSON format:
-            {{
-                "reference": "Figure X",
-                "description": "2-3 sentence comprehensive description",
-                "technical_details": "specific methodological and technical aspects",
-                "findings": "key results and measurements",
-                "context": "relevance to main arguments",
-                "panel_descriptions": ["description of panel a", "description of panel b", ...] (if applicable)
-            }}
-
-            Text:
-            {text_content}
-            """
-
-            context_response = self.client.chat.completions.create(
-                model="gpt-4-1106-preview",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert at analyzing scientific figures and extracting their complete context. 
-                        Focus on technical accuracy and quantitative details while maintaining clarity."""
-                    },
-                    {"role": "user", "content": context_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500,
-                response_format={"type": "json_object"}
-            )
+            paper_structure = self._analyze_structure(text_content)
+            selected, scoped_text = self._select_sections(paper_structure, text_content, sections)
+        except Exception as e:
+            logger.error(f"Error analyzing content: {str(e)}")
+            raise
+
+        figure_index = FigureIndex(text_content)
+        expected_titles = selected or [s["title"] for s in paper_structure.get("sections", [])]
+        figure_subset = figures
+        text_content = scoped_text
+        sections = queue.Queue()
+        done = object()
+        # Set once the caller stops consuming sections, e.g. after a render error
+        stop = threading.Event()
+
+        def read_stream():
+            # Runs in the background so the response keeps being consumed
+            # while the caller renders earlier sections
+            try:
+                stream = self.backend.stream_chat(**self._content_request(paper_structure, text_content, selected))
+                parser = ArrayItemStreamParser("sections")
+                for delta in stream:
+                    if stop.is_set():
+                        logger.info("Section consumer stopped; abandoning the analysis stream")
+                        if hasattr(stream, "close"):
+                            stream.close()
+                        return
+                    for section in parser.feed(delta):
+                        sections.put(section)
+                sections.put(done)
+            except Exception as e:
+                sections.put(e)
+
+        def iter_sections():
+            count = 0
+            matched = []
+            # Sections with incompletely analyzed figures wait here, in order,
+            # until nothing else has arrived; sections that stream in while a
+            # figure-context call runs then share the next batch
+            pending = []
+            pending_figures = set()
 
-            # Parse the JSON response
-            figure_context = json.loads(context_response.choices[0].message.content)
-            return figure_context
-            
+            def flush():
+                self._enrich_figures({"sections": pending}, figure_index)
+                ready = list(pending)
+                pending.clear()
+                pending_figures.clear()
+                return ready
+
+            def hold(section):
+                incomplete = self._attach_captions({"sections": [section]}, figure_index)
+                if pending or incomplete:
+                    pending.append(section)
+                    pending_figures.update(incomplete)
+                    return len(pending_figures) >= self.FIGURE_BATCH_SIZE
+                return False
+
+            while True:
+                item = sections.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    logger.error(f"Error analyzing content: {str(item)}")
+                    raise item
+
+                # With a selection, sections are only matched by title
+                title = self._match_title(item.get("title"), expected_titles, matched, by_position=not selected)
+                if title is not None:
+                    matched.append(title)
+                elif selected:
+                    continue
+
+                # Invalid sections are re-requested on their own before rendering
+                if validate_analysis_section(item):
+                    if title is None:
+                        logger.warning(f"Dropping unidentifiable section {count + 1}")
+                        continue
+                    item = self._reanalyze_sections(
+                        paper_structure, text_content, [title], {title: item}
+                    ).get(title)
+                    if item is None:
+                        continue
+
+                count += 1
+                logger.debug(f"Received section {count}: {item['title']}")
+                self._filter_figures(item, figure_subset)
+                if hold(item) or (pending and sections.empty()):
+                    yield from flush()
+                elif not pending:
+                    yield item
+
+            # Sections that never arrived are requested together at the end
+            missing = [t for t in expected_titles if t not in matched]
+            if missing:
+                repaired = self._reanalyze_sections(paper_structure, text_content, missing)
+                for title in missing:
+                    if title in repaired:
+                        count += 1
+                        self._filter_figures(repaired[title], figure_subset)
+                        if hold(repaired[title]):
+                            yield from flush()
+                        elif not pending:
+                            yield repaired[title]
+            yield from flush()
+            logger.info(f"Streamed {count} analyzed sections")
+
+        def consume_sections():
+            try:
+                yield from iter_sections()
+            finally:
+                stop.set()
+
+        threading.Thread(target=read_stream, daemon=True).start()
+        return paper_structure.get("title", ""), consume_sections()
+
+    def _complete_sections(self, analysis: Any, raw_response: str) -> List[Any]:
+        """Return the analyzed sections, leaving out one cut off by the token limit."""
+        sections = analysis.get("sections") if isinstance(analysis, dict) else None
+        if not isinstance(sections, list):
+            return []
+        # A section repaired after truncation can still pass validation, so
+        # the last one is treated as missing and requested again
+        if sections and is_truncated(self._clean_json_response(raw_response)):
+            logger.warning(f"Response was truncated; re-requesting section {len(sections)}")
+            return sections[:-1]
+        return sections
+
+    def _title_key(self, title: str) -> str:
+        """Normalize a section title for comparison, ignoring numbering and case."""
+        return re.sub(r'^[\dIVX]+(?:\.\d+)*\.?\s+', '', title).strip().lower()
+
+    def _match_title(self, title: Any, expected_titles: List[str], matched: List[str],
+                     by_position: bool = True) -> Optional[str]:
+        """
+        Find the structure section a received section stands for.
+        Titles are compared ignoring numbering and case; a section whose title
+        matches no remaining one (or that has none) takes the next position
+        after the last matched section, since models often rename headings.
+        """
+        if isinstance(title, str):
+            key = self._title_key(title)
+            for expected in expected_titles:
+                if expected not in matched and self._title_key(expected) == key:
+                    return expected
+        if not by_position:
+            return None
+
+        position = max((expected_titles.index(t) for t in matched), default=-1) + 1
+        if position < len(expected_titles) and expected_titles[position] not in matched:
+            return expected_titles[position]
+        return None
+
+    def _prune_section(self, section: Any, title: str) -> Dict[str, Any]:
+        """Drop the parts of a section that do not match the schema."""
+        section = dict(section) if isinstance(section, dict) else {}
+        section["title"] = title
+        content = []
+        for item in section.get("content") or []:
+            if not isinstance(item, dict):
+                continue
+            item = dict(item)
+            if "key_points" in item:
+                item["key_points"] = [p for p in item["key_points"] or []
+                                      if isinstance(p, dict) and isinstance(p.get("argument"), str)]
+            if "figures" in item:
+                item["figures"] = [f for f in item["figures"] or []
+                                   if isinstance(f, dict) and isinstance(f.get("reference"), str)]
+            content.append(item)
+        section["content"] = content
+        return section
+
+    def _request_sections(self, paper_structure: Dict[str, Any], text_content: str,
+                          titles: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Request the analysis of the given sections once; returns the complete ones by title."""
+        received = {}
+        try:
+            response = self.backend.chat(**self._content_request(paper_structure, text_content, titles))
+            analysis = self._parse_json(response, "section analysis")
+            for section in self._complete_sections(analysis, response):
+                if not isinstance(section, dict):
+                    continue
+                title = self._match_title(section.get("title"), titles, list(received))
+                if title is not None:
+                    received[title] = section
         except Exception as e:
-            logger.error(f"Error extracting figure context: {str(e)}")
-            return {
-                "reference": figure_ref,
-                "description": f"Description for {figure_ref}",
-                "technical_details": "",
-                "findings": "",
-                "context": "",
-                "panel_descriptions": []
-            }
\ No newline at end of file
+            logger.error(f"Error re-requesting sections: {str(e)}")
+        return received
+
+    def _reanalyze_sections(self, paper_structure: Dict[str, Any], text_content: str,
+                            titles: List[str], fallback: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Re-request the analysis of only the given sections, a few at a time and
+        with only their part of the text. A batch is requested again for its
+        remaining sections as long as each pass returns at least one of them.
+        Returns the sections by title; sections that are still invalid are pruned
+        down to their valid parts, starting from ``fallback`` when provided.
+        """
+        logger.info(f"Re-requesting analysis for {len(titles)} sections: {', '.join(titles)}")
+        fallback = fallback or {}
+        structure_titles = [s["title"] for s in paper_structure.get("sections", [])]
+        received = {}
+        remaining = list(titles)
+        while remaining:
+            batch = remaining[:self.REANALYZE_BATCH_SIZE]
+            batch_text = self._section_text(text_content, structure_titles, batch)
+            batch_received = self._request_sections(paper_structure, batch_text, batch)
+            received.update(batch_received)
+            remaining = [t for t in remaining if t not in received]
+            if not batch_received:
+                # No progress on this batch; give up on it
+                remaining = remaining[len(batch):]
+
+        repaired = {}
+        for title in titles:
+            section = received.get(title, fallback.get(title))
+            if section is not None and not validate_analysis_section(section):
+                repaired[title] = section
+            elif section is not None:
+                logger.warning(f"Section '{title}' is still invalid; keeping its valid parts")
+                repaired[title] = self._prune_section(section, title)
+            else:
+                logger.warning(f"Section '{title}' could not be analyzed")
+        return repaired
+
+    def _validated_sections(self, sections: List[Any], paper_structure: Dict[str, Any], text_content: str,
+                            selected: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Validate analyzed sections and re-request only the invalid or missing ones."""
+        expected_titles = selected or [s["title"] for s in paper_structure.get("sections", [])]
+
+        # (structure title or None, section or None while awaiting repair)
+        validated = []
+        invalid = {}
+        matched = []
+        for position, section in enumerate(sections):
+            errors = validate_analysis_section(section)
+            # With a selection, sections are only matched by title and the rest dropped
+            title = self._match_title(section.get("title") if isinstance(section, dict) else None,
+                                      expected_titles, matched, by_position=not selected)
+            if title is not None:
+                matched.append(title)
+            elif selected:
+                continue
+            if not errors:
+                validated.append((title, section))
+                continue
+            if title is None:
+                logger.warning(f"Dropping unidentifiable section {position + 1}: {errors[:3]}")
+                continue
+            logger.warning(f"Section '{title}' failed validation: {errors[:3]}")
+            invalid[title] = section
+            validated.append((title, None))
+
+        # Sections missing entirely, typically cut off by max_tokens
+        missing = [t for t in expected_titles if t not in matched]
+
+        if not invalid and not missing:
+            return [section for _, section in validated]
+
+        repaired = self._reanalyze_sections(paper_structure, text_content, list(invalid) + missing, invalid)
+        result = [(title, repaired.get(title) if section is None else section) for title, section in validated]
+
+        # Put recovered sections back at their place in the structure
+        order = {title: i for i, title in enumerate(expected_titles)}
+        for title in missing:
+            position = next((i for i, (other, _) in enumerate(result)
+                             if other is not None and order[other] > order[title]), len(result))
+            result.insert(position, (title, repaired.get(title)))
+        return [section for _, section in result if section is not None]
+
+    def _extract_figure_contexts(self, figure_index: FigureIndex, figure_refs: List[str],
+                                 batch_size: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract context for several figures using only their captions and the
+        sentences around their mentions, batching figures into few prompts.
+        Returns a dictionary mapping figure numbers to structured figure information;
+        figures whose batch failed are left out.
+        """
+        batch_size = batch_size or self.FIGURE_BATCH_SIZE
+        contexts = {}
+        for start in range(0, len(figure_refs), batch_size):
+            batch = figure_refs[start:start + batch_size]
+
+            figure_blocks = []
+            for figure_ref in batch:
+                local_text = figure_index.describe(figure_ref) or "(no caption or mentions found)"
+                figure_blocks.append(f"### {figure_ref}\n{local_text}")
+
+            try:
+                context_prompt = f"""
+                Analyze each of the following figures using only its caption and the
+                surrounding text from the paper. For every figure provide:
+
+                1. Caption and Basic Information:
+                   - Figure type (graph, diagram, flowchart, etc.)
+                   - Number of panels and their labels
+
+                2. Technical Content:
+                   - Methodology or approach illustrated
+                   - Technical parameters or conditions shown
+
+                3. Main Findings:
+                   - Key results demonstrated
+                   - Quantitative measurements
+
+                4. Contextual Integration:
+                   - How the figure supports main arguments
+
+                Return the analysis in this JSON format:
+                {{
+                    "figures": [
+                        {{
+                            "reference": "Figure X",
+                            "description": "2-3 sentence comprehensive description",
+                            "technical_details": "specific methodological and technical aspects",
+                            "findings": "key results and measurements",
+                            "context": "relevance to main arguments",
+                            "panel_descriptions": ["description of panel a", "description of panel b", ...] (if applicable)
+                        }}
+                    ]
+                }}
+
+                Figures:
+                {chr(10).join(figure_blocks)}
+                """
+
+                context_response = self.backend.chat(
+                    model=self.models["figures"],
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": """You are an expert at analyzing scientific figures and extracting their complete context. 
+                            Focus on technical accuracy and quantitative details while maintaining clarity."""
+                        },
+                        {"role": "user", "content": context_prompt}
+                    ],
+                    temperature=0.3,
+                    max_tokens=400 * len(batch),
+                    json_mode=True
+                )
+
+                # Parse the JSON response, skipping malformed entries
+                response = self._parse_json(context_response, "figure context")
+                if validate_figure_contexts(response):
+                    logger.warning(f"Figure context response for {', '.join(batch)} does not match the schema")
+                figures = response.get("figures", []) if isinstance(response, dict) else []
+                for figure_context in figures if isinstance(figures, list) else []:
+                    if not isinstance(figure_context, dict) or not isinstance(figure_context.get("reference"), str):
+                        continue
+                    key = figure_key(figure_context["reference"])
+                    if key:
+                        contexts[key] = figure_context
+
+            except Exception as e:
+                logger.error(f"Error extracting figure context for {', '.join(batch)}: {str(e)}")
+        return contexts
+
+    def _attach_captions(self, analysis: Dict[str, Any],
+                         figure_index: FigureIndex) -> Dict[str, List[Dict[str, Any]]]:
+        """Attach captions to analyzed figures and return the incompletely analyzed ones by figure number."""
+        incomplete = {}
+        for section in analysis.get("sections", []):
+            for item in section.get("content", []):
+                for figure_info in item.get("figures", []):
+                    if not isinstance(figure_info, dict):
+                        continue
+                    key = figure_key(figure_info.get("reference", ""))
+                    if not key:
+                        continue
+                    caption = figure_index.caption(key)
+                    if caption and not figure_info.get("caption"):
+                        figure_info["caption"] = caption
+                    if not (figure_info.get("description") and figure_info.get("results")):
+                        incomplete.setdefault(key, []).append(figure_info)
+        return incomplete
+
+    def _enrich_figures(self, analysis: Dict[str, Any], figure_index: FigureIndex):
+        """Attach captions to analyzed figures and fill in missing details from local context."""
+        incomplete = self._attach_captions(analysis, figure_index)
+        if not incomplete:
+            return
+
+        logger.info(f"Fetching local context for {len(incomplete)} incompletely analyzed figures")
+        contexts = self._extract_figure_contexts(figure_index, [f"Figure {key}" for key in incomplete])
+        for key, figure_infos in incomplete.items():
+            context = contexts.get(key, {})
+            for figure_info in figure_infos:
+                for target, source in [("description", "description"),
+                                       ("technical_content", "technical_details"),
+                                       ("results", "findings"),
+                                       ("integration", "context"),
+                                       ("panel_details", "panel_descriptions")]:
+                    if not figure_info.get(target) and context.get(source):
+                        figure_info[target] = context[source]
@@ -1,43 +1,129 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
 import logging
 import os
-import fitz  # PyMuPDF
 from src.figure_extractor import FigureExtractor
 from src.content_analyzer import ContentAnalyzer
+from src.figure_index import figure_key
+from src.llm_backends import LLMBackend
+from src.text_normalizer import normalize_pages
+from src.url_fetcher import URLFetcher, is_url
+from src.utils import open_pdf, resolve_pages
 
 logger = logging.getLogger(__name__)
 
 class DocumentProcessor:
-    def __init__(self):
-        """Initialize document processor with its components."""
-        self.figure_extractor = FigureExtractor()
-        self.content_analyzer = ContentAnalyzer()
+    def __init__(self, cache_dir: str = "output/cache", normalize_text: bool = True,
+                 llm_backend: Optional[LLMBackend] = None):
+        """Initialize document processor.
 
-    def _extract_text(self, pdf_path: str) -> str:
-        """Extract text content from PDF."""
+        Components are created on first use, so stages that are never
+        reached do not pay for their dependencies or clients. With
+        ``normalize_text`` page furniture, references and hyphenation are
+        stripped from the text before it reaches the prompts.
+        ``llm_backend`` overrides the backend configured in the environment.
+        """
+        self.cache_dir = cache_dir
+        self.llm_backend = llm_backend
+        self.normalize_text = normalize_text
+        self.normalization_report = None
+        self._figure_extractor = None
+        self._content_analyzer = None
+        self._url_fetcher = None
+
+    @property
+    def figure_extractor(self) -> FigureExtractor:
+        if self._figure_extractor is None:
+            self._figure_extractor = FigureExtractor()
+        return self._figure_extractor
+
+    @property
+    def content_analyzer(self) -> ContentAnalyzer:
+        if self._content_analyzer is None:
+            self._content_analyzer = ContentAnalyzer(self.llm_backend)
+        return self._content_analyzer
+
+    @property
+    def url_fetcher(self) -> URLFetcher:
+        if self._url_fetcher is None:
+            self._url_fetcher = URLFetcher(self.cache_dir)
+        return self._url_fetcher
+
+    def load_document(self, input_path: Union[str, bytes]) -> Union[str, bytes]:
+        """Resolve the input to something the PDF stages can open.
+
+        URLs are fetched through the local cache and returned as bytes; local
+        paths and bytes are returned unchanged.
+        """
+        if isinstance(input_path, str) and is_url(input_path):
+            return self.url_fetcher.fetch(input_path)
+        return input_path
+
+    def _extract_text(self, pdf_path: Union[str, bytes],
+                      pages: Optional[List[Tuple[int, Optional[int]]]] = None) -> str:
+        """Extract text content from a PDF path or in-memory PDF bytes.
+
+        Only the 1-based ``pages`` ranges are read when given; a selection
+        with no page inside the document raises ValueError.
+        """
         try:
-            text_content = ""
-            with fitz.open(pdf_path) as doc:
-                for page in doc:
-                    text_content += page.get_text()
+            with open_pdf(pdf_path) as doc:
+                page_numbers = resolve_pages(pages, len(doc)) if pages else range(len(doc))
+                pages = [doc[page_num].get_text() for page_num in page_numbers]
+            
+            if not self.normalize_text:
+                return "".join(pages)
+            
+            text_content, self.normalization_report = normalize_pages(pages)
             return text_content
         except Exception as e:
             logger.error(f"Error extracting text: {str(e)}")
             raise
 
-    def process_document(self, input_path: str) -> Tuple[dict, List[str]]:
-        """Process document and return analyzed content and figure paths."""
+    def extract_document(self, input_path: Union[str, bytes], figure_dir: Optional[str] = None,
+                         pages: Optional[List[Tuple[int, Optional[int]]]] = None,
+                         figures: Optional[List[str]] = None) -> Tuple[str, List[str]]:
+        """Extract text and figures without analyzing them.
+
+        ``input_path`` may be a local path, an http(s) URL or PDF bytes.
+        ``figure_dir`` overrides where extracted figures are written, so that
+        concurrent jobs can keep their figures apart. ``pages`` (parsed with
+        ``utils.parse_page_ranges``) limits both stages to those pages and
+        ``figures`` limits which figure numbers are saved.
+        """
         try:
+            # Fetch remote documents once, then work from memory
+            input_path = self.load_document(input_path)
+
             # Extract text content
-            text_content = self._extract_text(input_path)
+            text_content = self._extract_text(input_path, pages)
             
-            # Extract figures first
-            figures = self.figure_extractor.extract_figures(input_path)
+            # Extract figures
+            figure_numbers = {figure_key(f) for f in figures} if figures is not None else None
+            figures = self.figure_extractor.extract_figures(input_path, figure_dir, pages, figure_numbers)
             if not figures:
                 logger.warning("No figures were extracted from the document")
             
+            return text_content, figures
+            
+        except Exception as e:
+            logger.error(f"Error extracting document: {str(e)}")
+            raise
+
+    def process_document(self, input_path: Union[str, bytes], figure_dir: Optional[str] = None,
+                         pages: Optional[List[Tuple[int, Optional[int]]]] = None,
+                         sections: Optional[List[str]] = None,
+                         figures: Optional[List[str]] = None) -> Tuple[dict, List[str]]:
+        """Process document and return analyzed content and figure paths.
+
+        ``pages``, ``sections`` and ``figures`` restrict processing to a part
+        of the document, see ``extract_document`` and ``ContentAnalyzer.analyze_content``.
+        """
+        try:
+            selected_figures = figures
+            text_content, figures = self.extract_document(input_path, figure_dir, pages, selected_figures)
+            
             # Analyze content
-            analyzed_content = self.content_analyzer.analyze_content(text_content)
+            analyzed_content = self.content_analyzer.analyze_content(text_content, sections, selected_figures)
             
             return analyzed_content, figures
             
@@ -1,41 +1,125 @@
-import cv2
-import fitz  # PyMuPDF
-import numpy as np
+import hashlib
+import json
 import os
 import logging
-from typing import List
-from PIL import Image
+import shutil
+import tempfile
+from typing import Collection, Dict, List, Optional, Tuple, TYPE_CHECKING, Union
+from src.utils import format_page_ranges, open_pdf, resolve_pages
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
 class FigureExtractor:
-    def __init__(self):
-        """Initialize figure extractor."""
-        logger.info(f"Using OpenCV version: {cv2.__version__}")
-        self.output_dir = "output/figures"
-        os.makedirs(self.output_dir, exist_ok=True)
-
-    def _save_figure(self, image: np.ndarray, index: int) -> str:
-        """Save figure to file and return the file path."""
-        output_path = os.path.join(self.output_dir, f"figure_{index}.png")
+    # Smaller images are icons or logos rather than figures
+    MIN_FIGURE_WIDTH = 100
+    MIN_FIGURE_HEIGHT = 100
+
+    def __init__(self, output_dir: str = "output/figures"):
+        """Initialize figure extractor.
+
+        ``output_dir`` is only the default; directories are created when
+        figures are extracted into them.
+        """
+        self.output_dir = output_dir
+
+    def _document_hash(self, pdf_path: Union[str, bytes]) -> str:
+        """Return a short content hash identifying the PDF."""
+        if isinstance(pdf_path, (bytes, bytearray)):
+            return hashlib.sha256(pdf_path).hexdigest()[:16]
+
+        digest = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:16]
+
+    def document_dir(self, pdf_path: Union[str, bytes], output_dir: Optional[str] = None,
+                     pages: Optional[List[Tuple[int, Optional[int]]]] = None) -> str:
+        """Return the directory holding the figures of a given PDF.
+
+        Figures are namespaced by the PDF's content hash so that concurrent
+        conversions of different documents never share figure files. A page
+        selection gets its own directory, since it saves only some figures.
+        """
+        name = self._document_hash(pdf_path)
+        if pages:
+            name += f"_pages-{format_page_ranges(pages)}"
+        return os.path.join(output_dir or self.output_dir, name)
+
+    def _page_counts_path(self, pdf_path: Union[str, bytes], output_dir: Optional[str] = None) -> str:
+        """Return the file, next to the document's figure directories, holding its figure counts per page."""
+        return self.document_dir(pdf_path, output_dir) + ".pages.json"
+
+    def _load_page_counts(self, path: str) -> Dict[int, int]:
+        """Load the number of valid figures on each page scanned by an earlier run."""
+        try:
+            with open(path) as f:
+                return {int(page): count for page, count in json.load(f).items()}
+        except (OSError, ValueError, AttributeError) as e:
+            if os.path.exists(path):
+                logger.warning(f"Ignoring unreadable figure counts {path}: {str(e)}")
+            return {}
+
+    def _save_page_counts(self, path: str, page_counts: Dict[int, int]):
+        """Write the figure counts per page, replacing the file atomically."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".pages_", suffix=".json.tmp")
         try:
-            cv2.imwrite(output_path, image)
+            with os.fdopen(fd, "w") as f:
+                json.dump({str(page): count for page, count in sorted(page_counts.items())}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            logger.warning(f"Could not save figure counts {path}: {str(e)}")
+
+    def _save_figure(self, image: "np.ndarray", index: int, output_dir: str) -> str:
+        """Save figure to file and return the file path.
+
+        The image is written to a temporary file and renamed into place, so
+        readers never observe a partially written figure.
+        """
+        import cv2
+
+        output_path = os.path.join(output_dir, f"figure_{index}.png")
+        try:
+            success, buffer = cv2.imencode(".png", image)
+            if not success:
+                logger.error(f"Error encoding figure {index}")
+                return None
+
+            fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=".figure_", suffix=".png.tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(buffer.tobytes())
+                os.replace(tmp_path, output_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
             return output_path
         except Exception as e:
             logger.error(f"Error saving figure {index}: {str(e)}")
             return None
 
-    def _is_valid_figure(self, image: np.ndarray) -> bool:
+    def cleanup(self, pdf_path: Union[str, bytes], output_dir: Optional[str] = None,
+                pages: Optional[List[Tuple[int, Optional[int]]]] = None):
+        """Remove the figures extracted from a PDF once they are no longer needed."""
+        doc_dir = self.document_dir(pdf_path, output_dir, pages)
+        shutil.rmtree(doc_dir, ignore_errors=True)
+        logger.debug(f"Removed figure directory {doc_dir}")
+
+    def _is_valid_figure(self, image: "np.ndarray") -> bool:
         """Check if the image is a valid figure."""
         if image is None:
             return False
             
         # Add minimum size requirements
-        min_width = 100
-        min_height = 100
         height, width = image.shape[:2]
         
-        if width < min_width or height < min_height:
+        if width < self.MIN_FIGURE_WIDTH or height < self.MIN_FIGURE_HEIGHT:
             return False
             
         # Add basic image quality check
@@ -44,19 +128,56 @@ class FigureExtractor:
             
         return True
 
-    def extract_figures(self, pdf_path: str) -> List[str]:
-        """Extract figures from PDF and return list of saved figure paths."""
+    def extract_figures(self, pdf_path: Union[str, bytes], output_dir: Optional[str] = None,
+                        pages: Optional[List[Tuple[int, Optional[int]]]] = None,
+                        figure_numbers: Optional[Collection[str]] = None) -> List[str]:
+        """Extract figures from a PDF path or in-memory PDF bytes.
+
+        Returns the list of saved figure paths.
+
+        Figures are written to a per-document subdirectory of ``output_dir``
+        when given, otherwise of the extractor's default output directory.
+        Only figures on the 1-based page ``pages`` ranges are saved when given,
+        and only those numbered in ``figure_numbers``. Numbering always matches
+        a full run: figures on unselected pages before the last selected page
+        are still counted, just not saved. The number of figures on each page
+        is kept next to the figure directory, so later runs with a selection
+        skip decoding the pages they have already counted and do not need.
+        """
+        import cv2
+        import numpy as np
+
+        logger.debug(f"Using OpenCV version: {cv2.__version__}")
         try:
-            doc = fitz.open(pdf_path)
+            output_dir = self.document_dir(pdf_path, output_dir, pages)
+            os.makedirs(output_dir, exist_ok=True)
+            page_counts_path = self._page_counts_path(pdf_path, os.path.dirname(output_dir))
+            page_counts = self._load_page_counts(page_counts_path)
+            doc = open_pdf(pdf_path)
             figure_paths = []
+            figure_count = 0
             
-            for page_num in range(len(doc)):
+            selected_pages = set(resolve_pages(pages, len(doc))) if pages else None
+            last_page = max(selected_pages) if selected_pages is not None else len(doc) - 1
+            for page_num in range(last_page + 1):
+                skipped = selected_pages is not None and page_num not in selected_pages
+                # Pages counted before need no decoding unless they hold a wanted figure
+                counted = page_counts.get(page_num)
+                if counted is not None and (skipped or (figure_numbers is not None and not any(
+                        str(number) in figure_numbers
+                        for number in range(figure_count + 1, figure_count + counted + 1)))):
+                    figure_count += counted
+                    continue
                 page = doc[page_num]
                 image_list = page.get_images(full=True)
+                page_figures = 0
                 
                 for img_index, img_info in enumerate(image_list):
                     try:
-                        xref = img_info[0]
+                        # Width and height are known without decoding the image
+                        xref, _, width, height = img_info[:4]
+                        if width < self.MIN_FIGURE_WIDTH or height < self.MIN_FIGURE_HEIGHT:
+                            continue
                         base_image = doc.extract_image(xref)
                         
                         if not base_image or "image" not in base_image:
@@ -67,8 +188,13 @@ class FigureExtractor:
                         image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
                         
                         if image is not None and self._is_valid_figure(image):
-                            figure_index = len(figure_paths) + 1
-                            figure_path = self._save_figure(image, figure_index)
+                            # Numbering counts every valid figure, saved or not
+                            figure_count += 1
+                            page_figures += 1
+                            figure_index = figure_count
+                            if skipped or (figure_numbers is not None and str(figure_index) not in figure_numbers):
+                                continue
+                            figure_path = self._save_figure(image, figure_index, output_dir)
                             
                             if figure_path:
                                 figure_paths.append(figure_path)
@@ -77,7 +203,9 @@ class FigureExtractor:
                     except Exception as e:
                         logger.warning(f"Failed to process image {img_index} on page {page_num}: {str(e)}")
                         continue
+                page_counts[page_num] = page_figures
             
+            self._save_page_counts(page_counts_path, page_counts)
             logger.info(f"Extracted {len(figure_paths)} figures")
             return figure_paths
             
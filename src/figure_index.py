@@ -0,0 +1,161 @@
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "Figure 3", "Fig. 3", "Fig 3b", "Figure S2", "Figures 3"
+FIGURE_REF_PATTERN = re.compile(r'\b(?:Figures?|Figs?)\.?\s*(S?\d+)', re.IGNORECASE)
+# Lists and ranges: "Figures 3 and 4", "Figs. 3, 4b & 5", "Figs. 3–5", "Figures 2 to 4"
+FIGURE_LIST_PATTERN = re.compile(
+    r'\b(?:Figures?|Figs?)\.?\s*(S?\d+[a-z]?(?:\s*(?:,|and|&|to|[-–—])\s*S?\d+[a-z]?)*)', re.IGNORECASE
+)
+FIGURE_LIST_TOKEN = re.compile(r'S?\d+|to|[-–—]', re.IGNORECASE)
+# Longest range expanded from "Figs. 3–5"; anything longer is likely not a range
+MAX_RANGE = 20
+# Captions start a line: "Figure 3: ...", "Fig. 3. ...", "Figure 3 | ..."
+# and end at a blank line or at a line break after terminal punctuation
+CAPTION_END = re.compile(r'\n[ \t]*\n|[.!?][)\]"\']*[ \t]*\n')
+CAPTION_PATTERN = re.compile(r'^[ \t]*(?:Figure|Fig)\.?\s*(S?\d+)\s*[:.|]', re.IGNORECASE | re.MULTILINE)
+# Sentence ends at terminal punctuation followed by a capitalized word
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+[)\]"\']*\s+(?=[A-Z(\[])')
+# Abbreviations whose trailing period does not end a sentence
+ABBREVIATIONS = {'fig', 'figs', 'eq', 'eqs', 'sec', 'tab', 'ref', 'refs', 'al', 'e.g', 'i.e', 'vs', 'cf', 'approx', 'no'}
+
+
+def figure_key(figure_ref: str) -> Optional[str]:
+    """Normalize a figure reference such as "Fig. 3b" to its number ("3")."""
+    match = FIGURE_REF_PATTERN.search(figure_ref)
+    if match:
+        return match.group(1).upper()
+    digits = re.search(r'S?\d+', figure_ref, re.IGNORECASE)
+    return digits.group(0).upper() if digits else None
+
+
+def figure_keys(text: str) -> List[str]:
+    """Return the numbers of all figures referenced in a text, expanding lists and ranges."""
+    keys = []
+    for match in FIGURE_LIST_PATTERN.finditer(text):
+        in_range = False
+        for token in FIGURE_LIST_TOKEN.findall(match.group(1)):
+            if not token[-1].isdigit():
+                in_range = True
+                continue
+            key = token.upper()
+            previous = keys[-1] if keys else None
+            if (in_range and previous and previous[0].isdigit() == key[0].isdigit()
+                    and 0 < int(key.lstrip('S')) - int(previous.lstrip('S')) <= MAX_RANGE):
+                prefix = '' if key[0].isdigit() else 'S'
+                first, last = int(previous.lstrip('S')), int(key.lstrip('S'))
+                keys.extend(f"{prefix}{number}" for number in range(first + 1, last + 1))
+            else:
+                keys.append(key)
+            in_range = False
+    return list(dict.fromkeys(keys))
+
+
+class FigureIndex:
+    """Inverted index from figure numbers to their captions and mentions.
+
+    The text is split into sentences and scanned once; each figure maps to
+    its caption block and the positions of the sentences that mention it,
+    so the local context of any figure can be assembled without rescanning
+    the whole paper.
+    """
+
+    def __init__(self, text: str, window: int = 1, max_caption_chars: int = 1000):
+        self.text = text
+        self.window = window
+        self.max_caption_chars = max_caption_chars
+        self.sentences: List[str] = []
+        self.mentions: Dict[str, List[int]] = {}
+        self.captions: Dict[str, str] = {}
+        self._build()
+
+    def _caption_spans(self) -> List[Tuple[int, int, str]]:
+        """Locate caption blocks: from the caption label to the end of its paragraph."""
+        spans = []
+        for match in CAPTION_PATTERN.finditer(self.text):
+            start = match.start()
+            boundary = CAPTION_END.search(self.text, match.end())
+            end = boundary.start() + 1 if boundary else len(self.text)
+            end = min(end, start + self.max_caption_chars)
+            spans.append((start, end, match.group(1).upper()))
+        # A caption never runs into the next one
+        return [(start, min(end, spans[i + 1][0]) if i + 1 < len(spans) else end, key)
+                for i, (start, end, key) in enumerate(spans)]
+
+    def _sentence_spans(self) -> List[Tuple[int, int]]:
+        spans = []
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(self.text):
+            words = self.text[start:match.start()].split()
+            if words and words[-1].lower().rstrip('.') in ABBREVIATIONS:
+                continue
+            spans.append((start, match.end()))
+            start = match.end()
+        if start < len(self.text):
+            spans.append((start, len(self.text)))
+        return spans
+
+    def _build(self):
+        caption_spans = self._caption_spans()
+        for start, end, key in caption_spans:
+            # The first caption wins; later matches are usually in-text mentions
+            self.captions.setdefault(key, ' '.join(self.text[start:end].split()))
+
+        span_index = 0
+        for start, end in self._sentence_spans():
+            sentence = ' '.join(self.text[start:end].split())
+            if not sentence:
+                continue
+
+            # A caption does not mention its own figure, but may mention others
+            while span_index < len(caption_spans) and caption_spans[span_index][1] <= start:
+                span_index += 1
+            caption_key = None
+            if span_index < len(caption_spans):
+                caption_start, caption_end, key = caption_spans[span_index]
+                if caption_start <= start < caption_end:
+                    caption_key = key
+
+            position = len(self.sentences)
+            self.sentences.append(sentence)
+            for key in figure_keys(sentence):
+                if key != caption_key:
+                    self.mentions.setdefault(key, []).append(position)
+
+        logger.debug(f"Indexed {len(self.captions)} captions and {len(self.mentions)} referenced figures")
+
+    def figures(self) -> List[str]:
+        """Return all figure numbers that have a caption or a mention."""
+        keys = set(self.captions) | set(self.mentions)
+        return sorted(keys, key=lambda k: (k.startswith('S'), int(k.lstrip('S'))))
+
+    def caption(self, figure_ref: str) -> str:
+        return self.captions.get(figure_key(figure_ref) or '', '')
+
+    def context(self, figure_ref: str, max_mentions: int = 3) -> List[str]:
+        """Return the sentence windows around the first mentions of a figure."""
+        positions = self.mentions.get(figure_key(figure_ref) or '', [])[:max_mentions]
+
+        windows = []
+        for position in positions:
+            start = max(0, position - self.window)
+            end = min(len(self.sentences), position + self.window + 1)
+            # Merge overlapping windows
+            if windows and start <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], end)
+            else:
+                windows.append((start, end))
+
+        return [' '.join(self.sentences[start:end]) for start, end in windows]
+
+    def describe(self, figure_ref: str) -> str:
+        """Return the caption and surrounding text for a figure as one block."""
+        parts = []
+        caption = self.caption(figure_ref)
+        if caption:
+            parts.append(caption)
+        parts.extend(self.context(figure_ref))
+        return '\n'.join(parts)
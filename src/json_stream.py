@@ -0,0 +1,79 @@
+import json
+import logging
+from typing import Any, Dict, List
+from src.schema import loads_repaired
+
+logger = logging.getLogger(__name__)
+
+
+class ArrayItemStreamParser:
+    """Incrementally parse a streamed JSON object and emit array items early.
+
+    Feed the parser chunks of a JSON document such as
+    ``{"title": ..., "sections": [{...}, {...}]}``; every element of the
+    top-level ``array_key`` array is returned from ``feed`` as soon as its
+    closing brace arrives, long before the document itself is complete.
+    """
+
+    def __init__(self, array_key: str = "sections"):
+        self.array_key = array_key
+        self.buffer = ""
+        self._position = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_key = None
+        self._in_array = False
+        self._item_start = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of text and return the array items completed by it."""
+        self.buffer += chunk
+        items = []
+
+        while self._position < len(self.buffer):
+            index = self._position
+            char = self.buffer[index]
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    # Strings directly inside the top-level object may be keys
+                    if len(self._stack) == 1:
+                        self._last_key = json.loads(self.buffer[self._string_start:index + 1])
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in '{[':
+                if char == '[' and self._stack == ['{'] and self._last_key == self.array_key:
+                    self._in_array = True
+                elif char == '{' and self._in_array and len(self._stack) == 2:
+                    self._item_start = index
+                self._stack.append(char)
+            elif char in '}]':
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if char == '}' and self._in_array and len(self._stack) == 2 and self._item_start is not None:
+                    item_text = self.buffer[self._item_start:index + 1]
+                    self._item_start = None
+                    try:
+                        # The item is complete, so fix defects such as trailing
+                        # commas but never cut it short as if it were truncated
+                        items.append(loads_repaired(item_text, max_attempts=0))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping unparsable {self.array_key} item: {e}")
+                elif char == ']' and self._in_array and len(self._stack) == 1:
+                    self._in_array = False
+            elif char == ',' and len(self._stack) == 1:
+                self._last_key = None
+
+        return items
@@ -0,0 +1,242 @@
+"""LLM backends used by ContentAnalyzer.
+
+A backend turns chat messages into a completion, either at once (``chat``)
+or as text deltas (``stream_chat``).  Which model serves each pipeline stage
+is chosen separately, so a small model can extract structure while a large
+one does the analysis:
+
+    structure   paper structure extraction
+    analysis    detailed section analysis
+    figures     figure caption/context analysis
+
+Backends and models can be configured through the environment:
+
+    PDF2PPT_LLM_BACKEND     openai (default), http or fake
+    PDF2PPT_LLM_BASE_URL    base URL of an OpenAI-compatible server
+    PDF2PPT_LLM_API_KEY     API key sent to that server
+    PDF2PPT_MODEL_<STAGE>   model for a stage, e.g. PDF2PPT_MODEL_FIGURES
+"""
+import json
+import logging
+import os
+import re
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("structure", "analysis", "figures")
+DEFAULT_MODEL = "gpt-4-1106-preview"
+
+Messages = List[Dict[str, str]]
+
+
+def models_from_env(models: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Return the model for every stage: explicit choices, then environment, then the default."""
+    routing = {stage: os.getenv(f"PDF2PPT_MODEL_{stage.upper()}", DEFAULT_MODEL) for stage in STAGES}
+    routing.update(models or {})
+    return routing
+
+
+class LLMBackend(ABC):
+    """Interface for chat completion backends."""
+
+    @abstractmethod
+    def chat(self, messages: Messages, model: str, temperature: float,
+             max_tokens: Optional[int] = None, json_mode: bool = False) -> str:
+        """Return the full completion text."""
+
+    def stream_chat(self, messages: Messages, model: str, temperature: float,
+                    max_tokens: Optional[int] = None, json_mode: bool = False) -> Iterator[str]:
+        """Yield the completion text in pieces as it is generated."""
+        yield self.chat(messages, model, temperature, max_tokens, json_mode)
+
+
+class OpenAIBackend(LLMBackend):
+    """Backend using the official OpenAI client."""
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        import openai
+
+        self.client = openai.OpenAI(base_url=base_url, api_key=api_key)
+
+    def _arguments(self, messages, model, temperature, max_tokens, json_mode) -> Dict[str, Any]:
+        arguments = dict(model=model, messages=messages, temperature=temperature)
+        if max_tokens is not None:
+            arguments["max_tokens"] = max_tokens
+        if json_mode:
+            arguments["response_format"] = {"type": "json_object"}
+        return arguments
+
+    def chat(self, messages, model, temperature, max_tokens=None, json_mode=False):
+        response = self.client.chat.completions.create(
+            **self._arguments(messages, model, temperature, max_tokens, json_mode)
+        )
+        return response.choices[0].message.content
+
+    def stream_chat(self, messages, model, temperature, max_tokens=None, json_mode=False):
+        # Closing the stream drops the connection when the caller stops early
+        with self.client.chat.completions.create(
+            **self._arguments(messages, model, temperature, max_tokens, json_mode), stream=True
+        ) as stream:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+
+class HTTPBackend(LLMBackend):
+    """Backend for any server exposing the OpenAI ``/chat/completions`` API.
+
+    Talks plain HTTP with the standard library, so local inference servers
+    (vLLM, llama.cpp, Ollama, ...) can be used without the openai package.
+    """
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: float = 600,
+                 json_mode: bool = True):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.api_key = api_key
+        self.timeout = timeout
+        self.json_mode = json_mode
+
+    def _post(self, payload: Dict[str, Any]):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(self.url, data=json.dumps(payload).encode("utf-8"), headers=headers)
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def _payload(self, messages, model, temperature, max_tokens, json_mode) -> Dict[str, Any]:
+        payload = {"model": model, "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        # Not every server supports response_format, so it can be switched off
+        if json_mode and self.json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    def chat(self, messages, model, temperature, max_tokens=None, json_mode=False):
+        with self._post(self._payload(messages, model, temperature, max_tokens, json_mode)) as response:
+            body = json.load(response)
+        return body["choices"][0]["message"]["content"]
+
+    def stream_chat(self, messages, model, temperature, max_tokens=None, json_mode=False):
+        payload = self._payload(messages, model, temperature, max_tokens, json_mode)
+        payload["stream"] = True
+        with self._post(payload) as response:
+            # Server-sent events: one "data: {...}" line per chunk
+            for raw_line in response:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic offline backend for tests and air-gapped CI.
+
+    Builds a response from the prompt itself: numbered headings in the paper
+    text become sections, their sentences become points, and figure mentions
+    become figure entries.  The same prompt always yields the same response,
+    shaped to satisfy the structure, analysis and figure-context formats.
+    """
+
+    HEADING_PATTERN = re.compile(r'^[ \t]*(\d+)\.?[ \t]+([A-Z][^\n]{2,60})$', re.MULTILINE)
+    FIGURE_PATTERN = re.compile(r'\b(?:Figure|Fig\.?)\s*(S?\d+)', re.IGNORECASE)
+
+    def __init__(self, chunk_size: int = 64):
+        self.chunk_size = chunk_size
+        self.calls: List[Dict[str, Any]] = []
+
+    def _sentences(self, text: str, limit: int) -> List[str]:
+        sentences = [' '.join(s.split()) for s in re.split(r'(?<=[.!?])\s+', text)]
+        return [s for s in sentences if len(s) > 20][:limit]
+
+    def _figures(self, text: str) -> List[Dict[str, str]]:
+        figures = []
+        for number in dict.fromkeys(m.group(1).upper() for m in self.FIGURE_PATTERN.finditer(text)):
+            figures.append({
+                "reference": f"Figure {number}",
+                "description": f"Figure {number} as referenced in the text.",
+                "technical_content": "",
+                "results": f"Results shown in Figure {number}.",
+                "technical_details": "",
+                "findings": f"Results shown in Figure {number}.",
+                "context": "",
+            })
+        return figures
+
+    def _response(self, messages: Messages) -> Dict[str, Any]:
+        prompt = messages[-1]["content"]
+        paper_text = prompt.split("Paper text:", 1)[-1]
+        lines = [line.strip() for line in paper_text.splitlines() if line.strip()]
+
+        only = re.search(r'Analyze ONLY the following sections: ([^\n]+)', prompt)
+        selected = [t.strip() for t in only.group(1).split(";")] if only else None
+
+        headings = list(self.HEADING_PATTERN.finditer(paper_text))
+        blocks = []
+        for i, heading in enumerate(headings):
+            end = headings[i + 1].start() if i + 1 < len(headings) else len(paper_text)
+            blocks.append((heading.group(2).strip(), paper_text[heading.end():end]))
+        if not blocks:
+            blocks = [("Overview", paper_text)]
+
+        sections = []
+        for title, body in blocks:
+            if selected is not None and title not in selected:
+                continue
+            sentences = self._sentences(body, 3)
+            figures = self._figures(body)
+            sections.append({
+                "title": title,
+                "overview": sentences[0] if sentences else title,
+                "content": [{
+                    "subtitle": title,
+                    "points": sentences,
+                    "key_points": [{"argument": s, "evidence": "", "technical_details": "", "implications": ""}
+                                   for s in sentences],
+                    "figures": figures,
+                }],
+            })
+
+        # Figure-context prompts list each figure under a "### Figure N" header
+        figure_refs = re.findall(r'^\s*### (.+)$', prompt, re.MULTILINE)
+        return {
+            "title": lines[0] if lines else "Untitled",
+            "sections": sections,
+            "figures": self._figures(" ".join(figure_refs)),
+        }
+
+    def chat(self, messages, model, temperature, max_tokens=None, json_mode=False):
+        self.calls.append({"model": model, "messages": messages})
+        return json.dumps(self._response(messages))
+
+    def stream_chat(self, messages, model, temperature, max_tokens=None, json_mode=False):
+        text = self.chat(messages, model, temperature, max_tokens, json_mode)
+        for start in range(0, len(text), self.chunk_size):
+            yield text[start:start + self.chunk_size]
+
+
+def create_backend(name: Optional[str] = None, base_url: Optional[str] = None,
+                   api_key: Optional[str] = None) -> LLMBackend:
+    """Create a backend by name, falling back to the PDF2PPT_LLM_* environment variables."""
+    name = (name or os.getenv("PDF2PPT_LLM_BACKEND", "openai")).lower()
+    base_url = base_url or os.getenv("PDF2PPT_LLM_BASE_URL")
+    api_key = api_key or os.getenv("PDF2PPT_LLM_API_KEY")
+
+    if name == "openai":
+        return OpenAIBackend(base_url, api_key)
+    if name == "http":
+        if not base_url:
+            raise ValueError("The http backend requires a base URL (PDF2PPT_LLM_BASE_URL)")
+        return HTTPBackend(base_url, api_key)
+    if name == "fake":
+        return FakeBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
@@ -3,11 +3,11 @@ from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN, MSO_AUTO_SIZE
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 import logging
 import os
 import re
-from PIL import Image
+from src.figure_index import FigureIndex
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +44,9 @@ class PresentationGenerator:
         self.section_font_size = Pt(36)
         self.body_font_size = Pt(20)
         self.bullet_font_size = Pt(18)
+        
+        # Figure index over the paper text, built on first use
+        self._figure_index = None
 
     def _format_text_frame(self, text_frame, font_size=None):
         """Apply consistent formatting to text frame."""
@@ -162,17 +165,16 @@ class PresentationGenerator:
         return points
 
     def _extract_figure_description(self, text: str, figure_ref: str) -> str:
-        """Extract relevant description for a figure from the text."""
-        sentences = text.split('. ')
-        relevant_sentences = []
-        
-        # Find the figure reference
-        for i, sentence in enumerate(sentences):
-            if figure_ref.lower() in sentence.lower():
-                # Include the reference sentence and the next 2 sentences for context
-                relevant_sentences.extend(sentences[i:i+3])
+        """Extract relevant description for a figure from the text.
+
+        Uses the figure's caption and the sentences around its mentions; the
+        index over ``text`` is built once and reused for every figure.
+        """
+        if self._figure_index is None or self._figure_index.text is not text:
+            self._figure_index = FigureIndex(text)
         
-        return '. '.join(relevant_sentences) if relevant_sentences else text
+        description = self._figure_index.describe(figure_ref)
+        return description if description else text
 
     def _match_figure(self, figure_info: Dict[str, Any], figures: List[str]) -> str:
         """
@@ -202,7 +204,7 @@ class PresentationGenerator:
             for pattern in patterns:
                 matches = [
                     f for f in figures 
-                    if pattern.lower() in f.lower()
+                    if pattern.lower() in os.path.basename(f).lower()
                 ]
                 if matches:
                     logger.debug(f"Matched figure {fig_ref} to {matches[0]}")
@@ -215,6 +217,66 @@ class PresentationGenerator:
             logger.error(f"Error matching figure: {str(e)}")
             return None
 
+    def _add_section(self, section: Dict[str, Any], figures: List[str]) -> None:
+        """Render the slides for one analyzed section."""
+        if section['title'] in ['References', 'Acknowledgements']:
+            return
+            
+        # Add section title slide
+        self._add_section_slide(section['title'])
+        
+        # Add overview slide if available
+        if 'overview' in section:
+            self._add_content_slide(
+                f"{section['title']} Overview",
+                [section['overview']]
+            )
+        
+        # Process content
+        if 'content' in section:
+            for item in section['content']:
+                # Add content slides
+                if 'key_points' in item:
+                    points = []
+                    for point in item['key_points']:
+                        # Format each point with its evidence
+                        point_text = f"• {point['argument']}"
+                        if point.get('evidence'):
+                            point_text += f"\n  - Evidence: {point['evidence']}"
+                        if point.get('implications'):
+                            point_text += f"\n  - Impact: {point['implications']}"
+                        points.append(point_text)
+                    
+                    self._add_content_slide(
+                        item.get('subtitle', section['title']), 
+                        points
+                    )
+                
+                # Add figure slides
+                if 'figures' in item:
+                    for figure_info in item['figures']:
+                        matched_figure = self._match_figure(figure_info, figures)
+                        
+                        if matched_figure:
+                            # Create comprehensive description
+                            description = (
+                                f"{figure_info.get('description', '')}\n\n"
+                                f"Technical Details: {figure_info.get('technical_content', '')}\n"
+                                f"Results: {figure_info.get('results', '')}"
+                            )
+                            
+                            self._add_figure_slide(
+                                matched_figure,
+                                item.get('subtitle', section['title']),
+                                description
+                            )
+                        else:
+                            logger.warning(f"Figure not found: {figure_info.get('reference')}")
+
+    def _save(self):
+        self.prs.save(self.output_path)
+        logger.info(f"Presentation saved to {self.output_path}")
+
     def generate(self, content: Dict[str, Any], figures: List[str]) -> None:
         """Generate the presentation with improved figure handling."""
         try:
@@ -224,67 +286,36 @@ class PresentationGenerator:
             
             # Process each section
             for section in content['sections']:
-                if section['title'] in ['References', 'Acknowledgements']:
-                    continue
-                    
-                # Add section title slide
-                self._add_section_slide(section['title'])
-                
-                # Add overview slide if available
-                if 'overview' in section:
-                    self._add_content_slide(
-                        f"{section['title']} Overview",
-                        [section['overview']]
-                    )
-                
-                # Process content
-                if 'content' in section:
-                    for item in section['content']:
-                        # Add content slides
-                        if 'key_points' in item:
-                            points = []
-                            for point in item['key_points']:
-                                # Format each point with its evidence
-                                point_text = f"• {point['argument']}"
-                                if point.get('evidence'):
-                                    point_text += f"\n  - Evidence: {point['evidence']}"
-                                if point.get('implications'):
-                                    point_text += f"\n  - Impact: {point['implications']}"
-                                points.append(point_text)
-                            
-                            self._add_content_slide(
-                                item.get('subtitle', section['title']), 
-                                points
-                            )
-                        
-                        # Add figure slides
-                        if 'figures' in item:
-                            for figure_info in item['figures']:
-                                matched_figure = self._match_figure(figure_info, figures)
-                                
-                                if matched_figure:
-                                    # Create comprehensive description
-                                    description = (
-                                        f"{figure_info.get('description', '')}\n\n"
-                                        f"Technical Details: {figure_info.get('technical_content', '')}\n"
-                                        f"Results: {figure_info.get('results', '')}"
-                                    )
-                                    
-                                    self._add_figure_slide(
-                                        matched_figure,
-                                        item.get('subtitle', section['title']),
-                                        description
-                                    )
-                                else:
-                                    logger.warning(f"Figure not found: {figure_info.get('reference')}")
+                self._add_section(section, figures)
             
-            self.prs.save(self.output_path)
-            logger.info(f"Presentation saved to {self.output_path}")
+            self._save()
             
         except Exception as e:
             logger.error(f"Error generating presentation: {str(e)}")
             raise
 
+    def generate_stream(self, title: str, sections: Iterable[Dict[str, Any]], figures: List[str]) -> None:
+        """Generate the presentation from sections as they arrive.
+
+        Each section is rendered as soon as the iterable yields it, so slide
+        building overlaps with the generation of later sections.
+        """
+        try:
+            title_slide = self.prs.slides.add_slide(self.title_slide_layout)
+            title_slide.shapes.title.text = title
+            
+            for section in sections:
+                self._add_section(section, figures)
+            
+            self._save()
+            
+        except Exception as e:
+            logger.error(f"Error generating presentation: {str(e)}")
+            # Let a streaming producer know that no more sections are wanted
+            if hasattr(sections, "close"):
+                sections.close()
+            raise
+
     def _add_outline_slide(self, sections: List[str]):
         """Add an outline slide."""
         slide = self.prs.slides.add_slide(self.bullet_slide_layout)
@@ -355,6 +386,8 @@ class PresentationGenerator:
 
     def _add_figure_slide(self, figure_path: str, title: str, description: str = None):
         """Add a slide with a figure and optional description."""
+        from PIL import Image
+
         slide = self.prs.slides.add_slide(self.figure_slide_layout)  # Changed from picture_slide_layout
         
         # Add title
@@ -0,0 +1,249 @@
+import json
+import logging
+import re
+from typing import Any, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Schemas are written as plain Python structures:
+#   str / int / ...   value must be an instance of that type
+#   object            any value
+#   {"key": spec}     dict with a required key; "?key" marks it optional
+#   [spec]            list whose items all match spec
+# Unknown keys are allowed, since the model often adds extra detail.
+
+TEXT = object  # Free-text fields the slides only interpolate into strings
+
+STRUCTURE_SCHEMA = {
+    "title": str,
+    "sections": [{
+        "title": str,
+        "?content": [{
+            "?subtitle": TEXT,
+            "?points": [TEXT],
+            "?figures": [TEXT],
+        }],
+    }],
+}
+
+ANALYSIS_SECTION_SCHEMA = {
+    "title": str,
+    "?overview": TEXT,
+    "?content": [{
+        "?subtitle": TEXT,
+        "?key_points": [{
+            "argument": str,
+            "?evidence": TEXT,
+            "?technical_details": TEXT,
+            "?implications": TEXT,
+        }],
+        "?figures": [{
+            "reference": str,
+            "?description": TEXT,
+            "?technical_content": TEXT,
+            "?results": TEXT,
+            "?integration": TEXT,
+            "?panel_details": TEXT,
+        }],
+    }],
+}
+
+ANALYSIS_SCHEMA = {
+    "title": str,
+    "sections": [ANALYSIS_SECTION_SCHEMA],
+}
+
+FIGURE_CONTEXTS_SCHEMA = {
+    "figures": [{"reference": str}],
+}
+
+Validator = Callable[[Any, str], List[str]]
+
+
+def compile_schema(spec: Any) -> Callable[[Any], List[str]]:
+    """Compile a schema spec into a validator returning a list of error messages."""
+    validator = _compile(spec)
+    return lambda value: validator(value, "$")
+
+
+def _compile(spec: Any) -> Validator:
+    if spec is object:
+        return lambda value, path: []
+
+    if isinstance(spec, type):
+        def validate_type(value, path):
+            if isinstance(value, spec):
+                return []
+            return [f"{path}: expected {spec.__name__}, got {type(value).__name__}"]
+        return validate_type
+
+    if isinstance(spec, list):
+        item_validator = _compile(spec[0])
+
+        def validate_list(value, path):
+            if not isinstance(value, list):
+                return [f"{path}: expected list, got {type(value).__name__}"]
+            errors = []
+            for i, item in enumerate(value):
+                errors.extend(item_validator(item, f"{path}[{i}]"))
+            return errors
+        return validate_list
+
+    if isinstance(spec, dict):
+        fields = [(key.lstrip("?"), not key.startswith("?"), _compile(sub_spec))
+                  for key, sub_spec in spec.items()]
+
+        def validate_dict(value, path):
+            if not isinstance(value, dict):
+                return [f"{path}: expected object, got {type(value).__name__}"]
+            errors = []
+            for key, required, field_validator in fields:
+                if key in value:
+                    errors.extend(field_validator(value[key], f"{path}.{key}"))
+                elif required:
+                    errors.append(f"{path}: missing required key '{key}'")
+            return errors
+        return validate_dict
+
+    raise TypeError(f"Unsupported schema spec: {spec!r}")
+
+
+validate_structure = compile_schema(STRUCTURE_SCHEMA)
+validate_analysis = compile_schema(ANALYSIS_SCHEMA)
+validate_analysis_section = compile_schema(ANALYSIS_SECTION_SCHEMA)
+validate_figure_contexts = compile_schema(FIGURE_CONTEXTS_SCHEMA)
+
+
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def _strip_wrapping(text: str) -> str:
+    """Drop code fences and any prose before the first JSON container."""
+    text = text.replace('```json', '').replace('```', '').strip()
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    return text[min(starts):] if starts else text
+
+
+def _remove_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing bracket, outside of strings."""
+    result = []
+    in_string = escaped = False
+    segment_start = 0
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+                result.append(text[segment_start:i + 1])
+                segment_start = i + 1
+        elif char == '"':
+            result.append(_TRAILING_COMMA.sub(r'\1', text[segment_start:i]))
+            segment_start = i
+            in_string = True
+    tail = text[segment_start:]
+    result.append(tail if in_string else _TRAILING_COMMA.sub(r'\1', tail))
+    return ''.join(result)
+
+
+def _truncation_candidates(text: str) -> List[str]:
+    """Return closed-off variants of a truncated document, most complete first.
+
+    Every comma or opening bracket outside a string is a point where the text
+    can be cut and the open containers closed, dropping only the incomplete
+    trailing element.
+    """
+    cut_points: List[Tuple[int, Tuple[str, ...]]] = []
+    stack: List[str] = []
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char == '{':
+            # Cut before an object so a half-written one is dropped, not
+            # emptied; only the outermost object is kept as an empty shell
+            cut_points.append((i, tuple(stack)))
+            stack.append(char)
+            if len(stack) == 1:
+                cut_points.append((i + 1, tuple(stack)))
+        elif char == '[':
+            stack.append(char)
+            cut_points.append((i + 1, tuple(stack)))
+        elif char in '}]':
+            if stack:
+                stack.pop()
+        elif char == ',':
+            cut_points.append((i, tuple(stack)))
+
+    candidates = []
+    # Close the containers open at the very end first, unless the text stops
+    # inside a string (a half-written value) or right after a nested object
+    if not in_string and not (len(stack) > 1 and text.rstrip().endswith('{')):
+        candidates.append(text + ''.join(_CLOSERS[c] for c in reversed(stack)))
+    for position, open_stack in reversed(cut_points):
+        candidates.append(text[:position] + ''.join(_CLOSERS[c] for c in reversed(open_stack)))
+    return candidates
+
+
+def is_truncated(text: str) -> bool:
+    """Return True if JSON text stops inside a string or an unclosed container."""
+    depth = 0
+    in_string = escaped = False
+    for char in _strip_wrapping(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+    return in_string or depth > 0
+
+
+def loads_repaired(text: str, max_attempts: int = 200) -> Any:
+    """Parse JSON, locally repairing common model output defects if needed.
+
+    Handles code fences and leading prose, trailing commas and documents
+    truncated by the token limit.  ``max_attempts`` bounds the truncation
+    repairs tried; 0 disables them for text known to be complete.  Raises
+    ``json.JSONDecodeError`` if the text cannot be repaired.
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as original_error:
+        error = original_error
+
+    cleaned = _remove_trailing_commas(_strip_wrapping(text))
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        pass
+
+    for attempt, candidate in enumerate(_truncation_candidates(cleaned)):
+        if attempt >= max_attempts:
+            break
+        try:
+            value = json.loads(_remove_trailing_commas(candidate))
+            logger.warning(f"Repaired truncated JSON response after {attempt + 1} attempts")
+            return value
+        except json.JSONDecodeError:
+            continue
+
+    raise error
@@ -0,0 +1,419 @@
+"""Local HTTP conversion service.
+
+Runs a pool of pre-forked worker processes that import the heavy PDF, vision,
+PowerPoint and OpenAI dependencies once and keep their components warm, so a
+conversion request only pays for the conversion itself.  Every job gets its
+own output directory, which keeps concurrent jobs from overwriting each
+other's figures and presentations.
+
+Endpoints:
+    POST /jobs                      queue a job; JSON body ``{"input_path": "..."}``
+                                    (a local path or an http(s) URL), optionally
+                                    with "pages", "sections" and "figures"
+                                    or a raw ``application/pdf`` upload
+    GET  /jobs/<job_id>             job status
+    GET  /jobs/<job_id>/presentation  download the generated presentation
+    DELETE /jobs/<job_id>           cancel a queued job or remove a finished one
+                                    together with its directory
+    GET  /health                    liveness check
+
+Finished jobs and their directories are removed after ``--job-ttl`` seconds.
+
+Run with ``python -m src.service --port 8000 --workers 4``.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from src.url_fetcher import document_name
+from src.utils import parse_page_ranges, split_list
+
+logger = logging.getLogger(__name__)
+
+# Components owned by each worker process, built once by _init_worker
+_document_processor = None
+_ready_barrier = None
+
+
+def _init_worker(cache_dir: str, ready_barrier=None):
+    """Import heavy dependencies and build the pipeline components once per worker."""
+    global _document_processor, _ready_barrier
+    _ready_barrier = ready_barrier
+    # The pipeline imports these inside the methods that use them, so import
+    # them here or the first job in each worker would pay for it
+    import cv2  # noqa: F401
+    import fitz  # noqa: F401
+    import numpy  # noqa: F401
+    import PIL.Image  # noqa: F401
+    import src.presentation_generator  # noqa: F401
+    from src.document_processor import DocumentProcessor
+
+    _document_processor = DocumentProcessor(cache_dir)
+    # Components are built lazily; touch them so the LLM client is ready too
+    _document_processor.figure_extractor
+    _document_processor.content_analyzer
+    logger.info(f"Worker {os.getpid()} ready")
+
+
+def _warm_up(timeout: float = 120) -> int:
+    """Task used to make sure every worker has started.
+
+    Each task holds its worker at a barrier until all workers have one, so
+    an idle worker cannot take another worker's warm-up task.
+    """
+    if _ready_barrier is not None:
+        try:
+            _ready_barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            logger.warning(f"Worker {os.getpid()} timed out waiting for the other workers")
+    return os.getpid()
+
+
+def _run_job(input_path: str, job_dir: str, output_filename: str, cleanup_figures: bool = False,
+             options: Optional[Dict[str, Any]] = None) -> str:
+    """Convert a single document inside a worker and return the presentation path.
+
+    ``options`` may hold "pages" (parsed page ranges), "sections" and "figures"
+    to convert only part of the document.
+    """
+    from src.presentation_generator import PresentationGenerator
+
+    figure_dir = os.path.join(job_dir, "figures")
+    output_path = os.path.join(job_dir, output_filename)
+
+    options = options or {}
+    pages = options.get("pages")
+
+    source = _document_processor.load_document(input_path)
+    text_content, figures = _document_processor.extract_document(
+        source, figure_dir, pages, options.get("figures")
+    )
+
+    # Slides are rendered while later sections are still streaming in
+    title, sections = _document_processor.content_analyzer.analyze_content_stream(
+        text_content, options.get("sections"), options.get("figures")
+    )
+    PresentationGenerator(output_path).generate_stream(title, sections, figures)
+
+    # Figures are embedded in the saved presentation, so the files can go
+    if cleanup_figures:
+        _document_processor.figure_extractor.cleanup(source, figure_dir, pages)
+    return output_path
+
+
+class JobManager:
+    """Queue conversion jobs onto a warm worker pool and track their status."""
+
+    def __init__(self, output_root: str = "output", workers: int = 2, cleanup_figures: bool = False,
+                 job_ttl: Optional[float] = 24 * 3600):
+        self.jobs_dir = os.path.join(output_root, "jobs")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self.workers = workers
+        self.cleanup_figures = cleanup_figures
+        # Seconds a finished job is kept; None keeps jobs until they are deleted
+        self.job_ttl = job_ttl
+        # URL downloads are shared across jobs through one content-addressed cache
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(os.path.join(output_root, "cache"), multiprocessing.Barrier(workers)),
+        )
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Fork the workers up front so the first request does not pay for startup."""
+        # Submit every warm-up task before waiting, so the pool starts all workers
+        futures = [self._executor.submit(_warm_up) for _ in range(self.workers)]
+        pids = {future.result() for future in futures}
+        logger.info(f"Started {len(pids)} warm workers")
+
+    def shutdown(self):
+        """Stop accepting jobs and wait for running ones to finish."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id)
+
+    def new_job_id(self) -> str:
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_dir(job_id), exist_ok=True)
+        return job_id
+
+    def submit(self, job_id: str, input_path: str, output_filename: Optional[str] = None,
+               options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Queue a conversion of ``input_path`` under an id from ``new_job_id``."""
+        self.prune_expired()
+        if output_filename is None:
+            output_filename = document_name(input_path) + "_presentation.pptx"
+
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "input_path": input_path,
+            "output_path": None,
+            "error": None,
+            "created_at": time.time(),
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+
+        future = self._executor.submit(
+            _run_job, input_path, self.job_dir(job_id), output_filename, self.cleanup_figures, options
+        )
+        job["future"] = future
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+        logger.info(f"Queued job {job_id} for {input_path}")
+        return self.status(job_id)
+
+    def _on_done(self, job_id: str, future: Future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["finished_at"] = time.time()
+            if future.cancelled():
+                job["status"] = "cancelled"
+            elif future.exception() is not None:
+                job["status"] = "failed"
+                job["error"] = str(future.exception())
+                logger.error(f"Job {job_id} failed: {job['error']}")
+            else:
+                job["status"] = "done"
+                job["output_path"] = future.result()
+                logger.info(f"Job {job_id} finished: {job['output_path']}")
+
+    def delete(self, job_id: str) -> Optional[str]:
+        """Forget a job and remove its directory, cancelling it if it has not started.
+
+        Returns the job's status, or None if the job is unknown. Running jobs
+        cannot be stopped and are left in place.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+
+        # Cancelling runs _on_done, which takes the lock itself
+        future = job.get("future")
+        if future is not None and not future.cancel() and not future.done():
+            return "running"
+
+        with self._lock:
+            job = self._jobs.pop(job_id, job)
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        logger.info(f"Deleted job {job_id}")
+        return job["status"]
+
+    def prune_expired(self):
+        """Delete jobs, including those left over from earlier runs, finished more than ``job_ttl`` ago."""
+        if self.job_ttl is None:
+            return
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job["finished_at"] is not None and job["finished_at"] < cutoff]
+            known = set(self._jobs)
+
+        for job_id in expired:
+            self.delete(job_id)
+        for entry in os.scandir(self.jobs_dir):
+            if entry.is_dir() and entry.name not in known and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                logger.info(f"Removed stale job directory {entry.path}")
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a JSON-serializable snapshot of a job, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = {k: v for k, v in job.items() if k != "future"}
+
+        future = job.get("future")
+        if snapshot["status"] == "queued" and future is not None and future.running():
+            snapshot["status"] = "running"
+        return snapshot
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end for a JobManager."""
+
+    server_version = "pdf2ppt"
+
+    @property
+    def job_manager(self) -> JobManager:
+        return self.server.job_manager
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status: HTTPStatus, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+
+        if parts == ["health"]:
+            self._send_json(HTTPStatus.OK, {"status": "ok", "workers": self.job_manager.workers})
+            return
+
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.job_manager.status(parts[1])
+            if job is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown job {parts[1]}"})
+                return
+
+            if len(parts) == 2:
+                self._send_json(HTTPStatus.OK, job)
+                return
+
+            if parts[2] == "presentation":
+                if job["status"] != "done":
+                    self._send_json(HTTPStatus.CONFLICT, {"error": f"Job is {job['status']}"})
+                    return
+                with open(job["output_path"], "rb") as f:
+                    data = f.read()
+                self.send_response(HTTPStatus.OK)
+                self.send_header(
+                    "Content-Type",
+                    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                )
+                self.send_header(
+                    "Content-Disposition",
+                    f'attachment; filename="{os.path.basename(job["output_path"])}"',
+                )
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for {self.path}"})
+
+    def do_DELETE(self):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for {self.path}"})
+            return
+
+        status = self.job_manager.delete(parts[1])
+        if status is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown job {parts[1]}"})
+        elif status == "running":
+            self._send_json(HTTPStatus.CONFLICT, {"error": "Job is running"})
+        else:
+            self._send_json(HTTPStatus.OK, {"job_id": parts[1], "status": status, "deleted": True})
+
+    def _job_options(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse the optional page, section and figure selection of a job."""
+        options = {}
+        if params.get("pages"):
+            options["pages"] = parse_page_ranges(str(params["pages"]))
+        for key in ("sections", "figures"):
+            value = params.get(key)
+            if value is not None:
+                options[key] = [str(v) for v in value] if isinstance(value, list) else split_list(str(value))
+        return options
+
+    def do_POST(self):
+        if self.path.split("?")[0].rstrip("/") != "/jobs":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for {self.path}"})
+            return
+
+        try:
+            content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+            body = self._read_body()
+
+            if content_type == "application/pdf":
+                # Uploads pass the selection as query parameters
+                query = parse_qs(urlparse(self.path).query)
+                options = self._job_options({key: values[0] for key, values in query.items()})
+
+                # Uploaded PDFs are stored inside the job's own directory
+                job_id = self.job_manager.new_job_id()
+                input_path = os.path.join(self.job_manager.job_dir(job_id), "input.pdf")
+                with open(input_path, "wb") as f:
+                    f.write(body)
+                job = self.job_manager.submit(job_id, input_path, "presentation.pptx", options)
+            else:
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict):
+                    self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Request body must be a JSON object"})
+                    return
+                input_path = request.get("input_path")
+                if not input_path:
+                    self._send_json(HTTPStatus.BAD_REQUEST, {"error": "input_path is required"})
+                    return
+                options = self._job_options(request)
+                job = self.job_manager.submit(self.job_manager.new_job_id(), input_path, options=options)
+
+            self._send_json(HTTPStatus.ACCEPTED, job)
+
+        except json.JSONDecodeError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {str(e)}"})
+        except ValueError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except Exception as e:
+            logger.error(f"Error submitting job: {str(e)}")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, workers: int = 2, output_root: str = "output",
+          cleanup_figures: bool = False, job_ttl: Optional[float] = 24 * 3600):
+    """Start the worker pool and serve HTTP requests until interrupted."""
+    job_manager = JobManager(output_root, workers, cleanup_figures, job_ttl)
+    job_manager.start()
+
+    server = ThreadingHTTPServer((host, port), ConversionRequestHandler)
+    server.job_manager = job_manager
+    logger.info(f"Serving on http://{host}:{port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        job_manager.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the PDF2PPT conversion service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--output-dir", default=os.getenv("OUTPUT_DIR", "output"))
+    parser.add_argument("--cleanup-figures", action="store_true",
+                        help="delete extracted figures once the presentation is saved")
+    parser.add_argument("--job-ttl", type=float, default=24 * 3600,
+                        help="seconds to keep finished jobs and their files (0 keeps them)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    serve(args.host, args.port, args.workers, args.output_dir, args.cleanup_figures, args.job_ttl or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PAGE_NUMBER_PATTERN = re.compile(r'^(?:page\s*)?\d+(?:\s*(?:of|/)\s*\d+)?$', re.IGNORECASE)
+REFERENCES_PATTERN = re.compile(r'^[ \t]*(?:\d+\.?|[IVX]+\.)?[ \t]*(?:References|Bibliography|Works Cited)[ \t]*$',
+                                re.IGNORECASE | re.MULTILINE)
+APPENDIX_PATTERN = re.compile(r'^[ \t]*(?:[A-Z]\.?[ \t]+)?(?:Appendix|Appendices|Supplementary (?:Material|Information))\b',
+                              re.IGNORECASE | re.MULTILINE)
+# Untitled appendices start with a lettered heading such as "A Proofs" or "A.1 Setup";
+# no period after the letter, so author initials in references ("A. Smith") do not match
+LETTERED_APPENDIX_PATTERN = re.compile(r'^[ \t]*A(?:\.1)?[ \t]+[A-Z][a-z]+(?:[ \t]+[A-Za-z][a-z-]*){0,6}[ \t]*$',
+                                       re.MULTILINE)
+ABSTRACT_PATTERN = re.compile(r'^\s*abstract\b', re.IGNORECASE)
+AFFILIATION_PATTERN = re.compile(
+    r'[\w.+-]+@[\w-]+\.[\w.]+|\b(?:University|Universit\w+|Institute|Department|Dept\.|Laboratory|College|'
+    r'School of|Faculty of|Research Center|Centre)\b'
+)
+HYPHENATION_PATTERN = re.compile(r'(\S*[a-z])-\n[ \t]*([a-z]+)')
+WORD_PATTERN = re.compile(r'[^\W\d_]+')
+LETTER_PATTERN = re.compile(r'[^\W\d_]')
+CAPTION_PATTERN = re.compile(r'^(?:fig(?:ure)?|table|algorithm|eq(?:uation)?)\.?\s*s?\d', re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English prose (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _furniture_key(line: str) -> Optional[str]:
+    # Only lines with text can be running headers; numeric lines such as
+    # table cells and captions are content even when they repeat
+    key = line.strip().lower()
+    if not LETTER_PATTERN.search(key) or CAPTION_PATTERN.match(key):
+        return None
+    # Running headers often differ only by a leading or trailing page number
+    return re.sub(r'^\d+\b|\b\d+$', '#', key)
+
+
+def _remove_page_furniture(pages: List[List[str]], edge_lines: int, min_pages: int,
+                           repeat_ratio: float) -> Tuple[List[List[str]], int]:
+    """Drop page numbers and header/footer lines that recur across pages."""
+    def edges(lines):
+        content = [i for i, line in enumerate(lines) if line.strip()]
+        return set(content[:edge_lines] + content[-edge_lines:])
+
+    counts = Counter()
+    for lines in pages:
+        counts.update({_furniture_key(lines[i]) for i in edges(lines)} - {None})
+
+    # Page furniture is short; long recurring lines are more likely content
+    threshold = max(min_pages, repeat_ratio * len(pages))
+    repeated = {key for key, count in counts.items() if count >= threshold and len(key) <= 80}
+
+    removed = 0
+    cleaned_pages = []
+    for lines in pages:
+        edge_indices = edges(lines)
+        kept = []
+        for i, line in enumerate(lines):
+            if i in edge_indices and (_furniture_key(line) in repeated
+                                      or PAGE_NUMBER_PATTERN.match(line.strip())):
+                removed += 1
+                continue
+            kept.append(line)
+        cleaned_pages.append(kept)
+    return cleaned_pages, removed
+
+
+def _remove_affiliations(lines: List[str]) -> Tuple[List[str], int]:
+    """Drop author affiliation and e-mail lines between the title and the abstract."""
+    abstract_index = next((i for i, line in enumerate(lines) if ABSTRACT_PATTERN.match(line)), None)
+    if abstract_index is None:
+        return lines, 0
+
+    kept = lines[:1]
+    removed = 0
+    for line in lines[1:abstract_index]:
+        if AFFILIATION_PATTERN.search(line):
+            removed += 1
+        else:
+            kept.append(line)
+    return kept + lines[abstract_index:], removed
+
+
+def _remove_references(text: str) -> Tuple[str, int]:
+    """Cut the bibliography, keeping any appendix that follows it."""
+    matches = [m for m in REFERENCES_PATTERN.finditer(text) if m.start() > len(text) * 0.3]
+    if not matches:
+        return text, 0
+
+    start = matches[-1].start()
+    appendices = [pattern.search(text, matches[-1].end()) for pattern in (APPENDIX_PATTERN, LETTERED_APPENDIX_PATTERN)]
+    end = min((appendix.start() for appendix in appendices if appendix), default=len(text))
+    return text[:start] + text[end:], end - start
+
+
+def _join_hyphenation(text: str) -> Tuple[str, int]:
+    """
+    Join words split across lines. The parts are only joined when the joined
+    word appears elsewhere in the text; otherwise the hyphen is kept, since it
+    is more likely part of a compound such as "self-supervised".
+    """
+    vocabulary = {word.lower() for word in WORD_PATTERN.findall(text)}
+    joined = 0
+
+    def join(match):
+        nonlocal joined
+        fragment, rest = match.groups()
+        word = WORD_PATTERN.findall(fragment)[-1] + rest
+        if '-' in fragment or word.lower() not in vocabulary:
+            return f"{fragment}-{rest}"
+        joined += 1
+        return fragment + rest
+
+    return HYPHENATION_PATTERN.sub(join, text), joined
+
+
+def normalize_pages(pages: List[str], edge_lines: int = 3, min_pages: int = 3,
+                    repeat_ratio: float = 0.5) -> Tuple[str, Dict[str, Any]]:
+    """
+    Normalize per-page PDF text before it is sent to the model.
+    Removes running headers and footers, page numbers, first-page affiliation
+    lines, the bibliography and line-break hyphenation. Returns the normalized
+    text and a report of what was removed and the estimated tokens saved.
+    """
+    original = '\n'.join(pages)
+    page_lines = [page.replace('\u00ad', '').split('\n') for page in pages]
+
+    page_lines, furniture_removed = _remove_page_furniture(page_lines, edge_lines, min_pages, repeat_ratio)
+
+    affiliations_removed = 0
+    if page_lines:
+        page_lines[0], affiliations_removed = _remove_affiliations(page_lines[0])
+
+    text = '\n'.join('\n'.join(lines) for lines in page_lines)
+    text, references_removed = _remove_references(text)
+
+    text, dehyphenated = _join_hyphenation(text)
+    text = re.sub(r'\n{3,}', '\n\n', text).strip() + '\n'
+
+    original_tokens = estimate_tokens(original)
+    normalized_tokens = estimate_tokens(text)
+    report = {
+        "original_tokens": original_tokens,
+        "normalized_tokens": normalized_tokens,
+        "tokens_saved": original_tokens - normalized_tokens,
+        "percent_saved": round(100 * (original_tokens - normalized_tokens) / max(original_tokens, 1), 1),
+        "furniture_lines_removed": furniture_removed,
+        "affiliation_lines_removed": affiliations_removed,
+        "reference_chars_removed": references_removed,
+        "hyphenations_joined": dehyphenated,
+    }
+    logger.info(f"Normalized text: ~{report['tokens_saved']} tokens saved ({report['percent_saved']}%)")
+    logger.debug(f"Normalization report: {report}")
+    return text, report
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+def is_url(input_path: str) -> bool:
+    """Return True if the input is an http(s) URL rather than a local path."""
+    return urlparse(input_path).scheme in ("http", "https")
+
+
+def document_name(input_path: str) -> str:
+    """Return a file-name stem for a local path or URL.
+
+    URL names keep their dots (``2401.12345v1``), only a ``.pdf`` suffix is
+    dropped.
+    """
+    if is_url(input_path):
+        name = os.path.basename(urlparse(input_path).path.rstrip("/")) or urlparse(input_path).netloc
+        return name[:-4] if name.lower().endswith(".pdf") else name
+    return os.path.splitext(os.path.basename(input_path))[0]
+
+
+class URLFetcher:
+    """Download PDFs into a content-addressed local cache.
+
+    Downloads are streamed to disk in chunks while being hashed and stored
+    as ``objects/<sha256>.pdf``; a per-URL index entry records the ETag and
+    Last-Modified headers so later fetches can revalidate with a conditional
+    request and reuse the cached bytes on ``304 Not Modified``.
+    """
+
+    def __init__(self, cache_dir: str = "output/cache", max_age: float = 3600,
+                 timeout: float = 60, chunk_size: int = 1 << 16):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_dir = os.path.join(cache_dir, "index")
+        self.max_age = max_age
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.index_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, f"{digest}.pdf")
+
+    def _load_entry(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cache entry for a URL if both index and object exist."""
+        try:
+            with open(self._index_path(url), "r") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not os.path.exists(self._object_path(entry.get("sha256", ""))):
+            return None
+        return entry
+
+    def _write_atomic(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read_object(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as f:
+            return f.read()
+
+    def _download(self, response, url: str) -> str:
+        """Stream a response body into the object store and return its hash.
+
+        Raises ValueError without caching anything if the body is not a PDF,
+        e.g. an HTML error page.
+        """
+        head = b""
+        while len(head) < 4:
+            chunk = response.read(4 - len(head))
+            if not chunk:
+                break
+            head += chunk
+        if not head.startswith(b"%PDF"):
+            raise ValueError(f"URL did not return a PDF document: {url}")
+
+        digest = hashlib.sha256(head)
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(head)
+                for chunk in iter(lambda: response.read(self.chunk_size), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+            sha256 = digest.hexdigest()
+            os.replace(tmp_path, self._object_path(sha256))
+            return sha256
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def fetch(self, url: str) -> bytes:
+        """Return the PDF bytes for a URL, downloading or revalidating as needed."""
+        entry = self._load_entry(url)
+
+        if entry and time.time() - entry.get("checked_at", 0) < self.max_age:
+            logger.info(f"Using cached copy of {url}")
+            return self._read_object(entry["sha256"])
+
+        headers = {"User-Agent": "pdf2ppt/0.1"}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                sha256 = self._download(response, url)
+                entry = {
+                    "url": url,
+                    "sha256": sha256,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+                logger.info(f"Downloaded {url} ({os.path.getsize(self._object_path(sha256))} bytes)")
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or not entry:
+                logger.error(f"Error downloading {url}: {str(e)}")
+                raise
+            logger.info(f"Cached copy of {url} is still valid")
+
+        data = self._read_object(entry["sha256"])
+        entry["checked_at"] = time.time()
+        self._write_atomic(self._index_path(url), json.dumps(entry).encode("utf-8"))
+        return data
@@ -1,6 +1,6 @@
 import logging
 import os
-from dotenv import load_dotenv
+from typing import List, Optional, Tuple, Union
 
 # Configure logging
 logging.basicConfig(
@@ -11,7 +11,69 @@ logging.basicConfig(
 def get_logger(name):
     return logging.getLogger(name)
 
+def open_pdf(source: Union[str, bytes]):
+    """Open a PDF from a file path or from in-memory bytes."""
+    import fitz  # PyMuPDF
+
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+def parse_page_ranges(spec: str) -> List[Tuple[int, Optional[int]]]:
+    """Parse a 1-based page selection such as "1-3,7,10-" into inclusive ranges.
+
+    An open end ("10-") runs to the last page. Raises ValueError on bad input.
+    """
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, dash, end = part.partition('-')
+        try:
+            first = int(start) if start.strip() else 1
+            last = (int(end) if end.strip() else None) if dash else first
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part!r}")
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range: {part!r}")
+        ranges.append((first, last))
+    if not ranges:
+        raise ValueError(f"Empty page selection: {spec!r}")
+    return ranges
+
+def resolve_pages(ranges: List[Tuple[int, Optional[int]]], page_count: int) -> List[int]:
+    """Turn parsed page ranges into sorted zero-based page indices within the document.
+
+    Pages past the end are ignored; raises ValueError when none of the selected pages exist.
+    """
+    pages = set()
+    for first, last in ranges:
+        pages.update(range(first - 1, min(last or page_count, page_count)))
+    if not pages:
+        raise ValueError(f"No selected page exists: {format_page_ranges(ranges).replace('_', ',')} "
+                         f"(the document has {page_count} pages)")
+    return sorted(pages)
+
+def format_page_ranges(ranges: List[Tuple[int, Optional[int]]]) -> str:
+    """Format parsed page ranges compactly for use in file names, e.g. "1-3_7_10-end"."""
+    parts = []
+    for first, last in ranges:
+        if last == first:
+            parts.append(str(first))
+        else:
+            parts.append(f"{first}-{last if last is not None else 'end'}")
+    return '_'.join(parts)
+
+def split_list(spec: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated option into a list, keeping None for "not given"."""
+    if spec is None:
+        return None
+    return [item.strip() for item in spec.split(',') if item.strip()]
+
 def load_environment():
+    from dotenv import load_dotenv
+
     load_dotenv()
     return {
         'CLAUDE_API_KEY': os.getenv('CLAUDE_API_KEY'),
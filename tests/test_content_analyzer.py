@@ -0,0 +1,212 @@
+import threading
+import unittest
+
+from src.content_analyzer import ContentAnalyzer
+from src.llm_backends import FakeBackend, LLMBackend
+
+PAPER_TEXT = """Streaming Slides for Papers
+
+1 Introduction
+This paper studies how slides can be generated from papers. Figure 1 gives an overview of the pipeline.
+
+2 Method
+The method streams the analysis while rendering slides. Figure 2 shows the streaming architecture in detail.
+
+3 Results
+Streaming reduces the time to the first slide considerably. Figure 3 compares the latency of both modes.
+
+Figure 1: Overview of the pipeline.
+
+Figure 2: Streaming architecture.
+
+Figure 3: Latency comparison.
+"""
+
+LONG_PAPER_TITLES = ["Introduction", "Method", "Results", "Discussion", "Conclusion"]
+LONG_PAPER_TEXT = "Sectioned Paper\n\n" + "\n\n".join(
+    f"{number} {title}\nThe {title.lower()} section of this paper explains one part of the work."
+    for number, title in enumerate(LONG_PAPER_TITLES, 1)
+)
+
+MODELS = {"structure": "structure-model", "analysis": "analysis-model", "figures": "figures-model"}
+
+
+class IncompleteFiguresBackend(FakeBackend):
+    """Fake backend whose section analyses leave figure details empty."""
+
+    def _response(self, messages):
+        response = super()._response(messages)
+        for section in response["sections"]:
+            for item in section["content"]:
+                for figure in item["figures"]:
+                    figure["description"] = figure["results"] = ""
+        return response
+
+
+class ShortAnswerBackend(FakeBackend):
+    """Fake backend whose section analyses stop after ``limit`` sections, as if cut off."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    def _response(self, messages):
+        response = super()._response(messages)
+        if "Perform a comprehensive analysis" in messages[-1]["content"]:
+            response["sections"] = response["sections"][:self.limit]
+        return response
+
+
+class BlockingStreamBackend(FakeBackend):
+    """Fake backend that sends a streamed chunk each time ``next_chunk`` is released."""
+
+    def __init__(self):
+        super().__init__(chunk_size=16)
+        self.next_chunk = threading.Semaphore(0)
+        self.chunks_total = 0
+        self.chunks_sent = 0
+        self.closed = threading.Event()
+
+    def stream_chat(self, messages, model, temperature, max_tokens=None, json_mode=False):
+        chunks = list(super().stream_chat(messages, model, temperature, max_tokens, json_mode))
+        self.chunks_total = len(chunks)
+        try:
+            for chunk in chunks:
+                self.next_chunk.acquire()
+                self.chunks_sent += 1
+                yield chunk
+        finally:
+            self.closed.set()
+
+
+class BlockingIncompleteFiguresBackend(BlockingStreamBackend, IncompleteFiguresBackend):
+    """Blocking stream whose section analyses leave figure details empty."""
+
+
+class ContentAnalyzerTest(unittest.TestCase):
+    def test_backend_requires_chat(self):
+        with self.assertRaises(TypeError):
+            LLMBackend()
+
+    def test_analyze_content(self):
+        backend = FakeBackend()
+        analysis = ContentAnalyzer(backend, MODELS).analyze_content(PAPER_TEXT)
+
+        self.assertEqual(analysis["title"], "Streaming Slides for Papers")
+        self.assertEqual([s["title"] for s in analysis["sections"]], ["Introduction", "Method", "Results"])
+        self.assertEqual([c["model"] for c in backend.calls], ["structure-model", "analysis-model"])
+
+    def test_analyze_content_stream(self):
+        backend = FakeBackend(chunk_size=7)
+        title, sections = ContentAnalyzer(backend, MODELS).analyze_content_stream(PAPER_TEXT)
+
+        self.assertEqual(title, "Streaming Slides for Papers")
+        self.assertEqual([s["title"] for s in sections], ["Introduction", "Method", "Results"])
+        self.assertEqual([c["model"] for c in backend.calls], ["structure-model", "analysis-model"])
+
+    def test_stream_stops_when_consumer_stops(self):
+        backend = BlockingStreamBackend()
+        title, sections = ContentAnalyzer(backend, MODELS).analyze_content_stream(PAPER_TEXT)
+
+        # Feed chunks slowly until the first section arrives, then stop consuming
+        consumed = threading.Event()
+
+        def release_chunks():
+            while not consumed.is_set():
+                backend.next_chunk.release()
+                consumed.wait(0.002)
+
+        threading.Thread(target=release_chunks, daemon=True).start()
+        next(sections)
+        sections.close()
+        consumed.set()
+        backend.next_chunk.release(2)
+
+        self.assertTrue(backend.closed.wait(5))
+        self.assertLess(backend.chunks_sent, backend.chunks_total)
+
+    def test_incomplete_figures_use_figures_model_in_one_batch(self):
+        backend = IncompleteFiguresBackend()
+        analysis = ContentAnalyzer(backend, MODELS).analyze_content(PAPER_TEXT)
+
+        self.assertEqual([c["model"] for c in backend.calls],
+                         ["structure-model", "analysis-model", "figures-model"])
+        figure = analysis["sections"][1]["content"][0]["figures"][0]
+        self.assertEqual(figure["caption"], "Figure 2: Streaming architecture.")
+        self.assertEqual(figure["results"], "Results shown in Figure 2.")
+
+    def test_incomplete_figures_do_not_hold_back_the_stream(self):
+        backend = BlockingIncompleteFiguresBackend()
+        title, sections = ContentAnalyzer(backend, MODELS).analyze_content_stream(PAPER_TEXT)
+
+        finished = threading.Event()
+
+        def release_chunks():
+            while not finished.is_set():
+                backend.next_chunk.release()
+                finished.wait(0.002)
+
+        threading.Thread(target=release_chunks, daemon=True).start()
+        first = next(sections)
+        self.assertLess(backend.chunks_sent, backend.chunks_total)
+        self.assertEqual(first["content"][0]["figures"][0]["results"], "Results shown in Figure 1.")
+
+        rest = list(sections)
+        finished.set()
+        self.assertEqual([s["title"] for s in rest], ["Method", "Results"])
+        self.assertTrue(all(f["results"] for s in rest for c in s["content"] for f in c["figures"]))
+        self.assertIn("figures-model", [c["model"] for c in backend.calls])
+
+    def test_missing_sections_are_re_requested_in_small_groups(self):
+        backend = ShortAnswerBackend(limit=2)
+        analyzer = ContentAnalyzer(backend, MODELS)
+        analyzer.REANALYZE_BATCH_SIZE = 2
+        analysis = analyzer.analyze_content(LONG_PAPER_TEXT)
+
+        self.assertEqual([s["title"] for s in analysis["sections"]], LONG_PAPER_TITLES)
+        re_requests = [c["messages"][-1]["content"] for c in backend.calls[2:]]
+        self.assertEqual(len(re_requests), 2)
+        # Each re-request carries only the text of its own sections
+        self.assertIn("Analyze ONLY the following sections: Results; Discussion", re_requests[0])
+        self.assertIn("The results section", re_requests[0])
+        self.assertNotIn("The method section", re_requests[0])
+        self.assertNotIn("The conclusion section", re_requests[0])
+        self.assertIn("The conclusion section", re_requests[1])
+        self.assertNotIn("The results section", re_requests[1])
+
+    def test_re_request_retries_while_it_makes_progress(self):
+        backend = ShortAnswerBackend(limit=1)
+        analysis = ContentAnalyzer(backend, MODELS).analyze_content(LONG_PAPER_TEXT)
+
+        self.assertEqual([s["title"] for s in analysis["sections"]], LONG_PAPER_TITLES)
+        self.assertEqual(len(backend.calls), 2 + 4)
+
+    def test_section_text(self):
+        analyzer = ContentAnalyzer(FakeBackend(), MODELS)
+        titles = ["1 Introduction", "2. Method", "Results"]
+
+        text = analyzer._section_text(PAPER_TEXT, titles, ["2. Method", "Results"])
+        self.assertTrue(text.startswith("2 Method\n"))
+        self.assertIn("3 Results", text)
+        self.assertNotIn("1 Introduction", text)
+
+        text = analyzer._section_text(PAPER_TEXT, titles, ["1 Introduction"])
+        self.assertIn("overview of the pipeline", text)
+        self.assertNotIn("2 Method", text)
+
+        # An unknown heading falls back to the whole text
+        self.assertEqual(analyzer._section_text(PAPER_TEXT, ["Appendix"], ["Appendix"]), PAPER_TEXT)
+
+    def test_section_selection(self):
+        backend = FakeBackend()
+        analysis = ContentAnalyzer(backend, MODELS).analyze_content(PAPER_TEXT, sections=["method"], figures=["2"])
+
+        self.assertEqual([s["title"] for s in analysis["sections"]], ["Method"])
+        prompt = backend.calls[1]["messages"][-1]["content"]
+        self.assertNotIn("time to the first slide", prompt)
+        references = [f["reference"] for s in analysis["sections"] for c in s["content"] for f in c["figures"]]
+        self.assertEqual(references, ["Figure 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from src.figure_extractor import FigureExtractor
+
+PDF_BYTES = b"%PDF-1.4\n% test document\n"
+
+
+class FigureExtractorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.extractor = FigureExtractor(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_document_dir_is_namespaced_by_content_and_pages(self):
+        full = self.extractor.document_dir(PDF_BYTES)
+        selected = self.extractor.document_dir(PDF_BYTES, pages=[(1, 3), (7, None)])
+
+        self.assertEqual(os.path.dirname(full), self.tmp.name)
+        self.assertEqual(selected, full + "_pages-1-3_7-end")
+        self.assertNotEqual(self.extractor.document_dir(PDF_BYTES + b"x"), full)
+        self.assertFalse(os.path.exists(full))
+
+    def test_page_counts_round_trip_next_to_document_dir(self):
+        path = self.extractor._page_counts_path(PDF_BYTES)
+        self.assertEqual(path, self.extractor.document_dir(PDF_BYTES) + ".pages.json")
+        self.assertEqual(self.extractor._load_page_counts(path), {})
+
+        self.extractor._save_page_counts(path, {0: 2, 3: 0, 1: 1})
+        self.assertEqual(self.extractor._load_page_counts(path), {0: 2, 1: 1, 3: 0})
+        self.assertEqual(os.listdir(self.tmp.name), [os.path.basename(path)])
+
+    def test_unreadable_page_counts_are_ignored(self):
+        path = self.extractor._page_counts_path(PDF_BYTES)
+        with open(path, "w") as f:
+            f.write("[1, 2")
+        self.assertEqual(self.extractor._load_page_counts(path), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
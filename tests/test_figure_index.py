@@ -0,0 +1,72 @@
+import unittest
+
+from src.figure_index import FigureIndex, figure_key, figure_keys
+
+PAPER_TEXT = """1 Introduction
+We propose a new architecture, shown in Figure 1. Its training curve is in Fig. 2b.
+The results (Figures 3 and 4) are discussed in Sec. 4.
+Figure 1: The architecture. Panel (a) shows the encoder,
+panel (b) the decoder; compare with Figure 3.
+More body text follows the caption. Figs. 3–5 compare things. Fig. 3b is zoomed.
+
+Figure 2. Training curves.
+Figure 3 | Latency comparison.
+"""
+
+
+class FigureKeysTest(unittest.TestCase):
+    def test_single_references(self):
+        self.assertEqual(figure_key("Fig. 3b"), "3")
+        self.assertEqual(figure_key("Figure S2: supplementary"), "S2")
+        self.assertEqual(figure_key("Figures 7 and 8"), "7")
+        self.assertEqual(figure_key("figure_12.png"), "12")
+
+    def test_lists_and_ranges(self):
+        self.assertEqual(figure_keys("Figures 3 and 4"), ["3", "4"])
+        self.assertEqual(figure_keys("Figs. 3, 4b & 6"), ["3", "4", "6"])
+        self.assertEqual(figure_keys("Figs. 3–5"), ["3", "4", "5"])
+        self.assertEqual(figure_keys("Figures 2 to 4 and Figure S1-S2"), ["2", "3", "4", "S1", "S2"])
+
+    def test_words_after_a_reference_are_not_numbers(self):
+        self.assertEqual(figure_keys("Figure 1 and the results in Figure 2 - in short"), ["1", "2"])
+        self.assertEqual(figure_keys("Figure 3-2019 is not a range"), ["3", "2019"])
+
+
+class FigureIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = FigureIndex(PAPER_TEXT)
+
+    def test_captions_end_at_their_paragraph(self):
+        self.assertEqual(self.index.caption("Figure 1"),
+                         "Figure 1: The architecture. Panel (a) shows the encoder, "
+                         "panel (b) the decoder; compare with Figure 3.")
+        self.assertEqual(self.index.caption("Fig. 2"), "Figure 2. Training curves.")
+        self.assertEqual(self.index.caption("Figure 3"), "Figure 3 | Latency comparison.")
+
+    def test_caption_without_blank_line_does_not_swallow_text(self):
+        index = FigureIndex("Figure 2: The architecture. Panel (a) shows X.\n"
+                            "More text here. Figures 3 and 4 compare things. Fig. 3b is zoomed.\n\n")
+        self.assertEqual(index.caption("Figure 2"), "Figure 2: The architecture. Panel (a) shows X.")
+        self.assertIn("Figures 3 and 4 compare things.", index.context("Figure 4")[0])
+        self.assertEqual(len(index.mentions["3"]), 2)
+        self.assertEqual(len(index.mentions["4"]), 1)
+        self.assertNotIn("2", index.mentions)
+
+    def test_mentions(self):
+        # Captions do not mention their own figure, but can mention others
+        self.assertEqual(self.index.figures(), ["1", "2", "3", "4", "5"])
+        caption_sentences = [self.index.sentences[p] for p in self.index.mentions["3"]]
+        self.assertTrue(any("compare with Figure 3" in s for s in caption_sentences))
+        self.assertFalse(any(s.startswith("Figure 1:") for s in
+                             (self.index.sentences[p] for p in self.index.mentions["1"])))
+        self.assertIn("Figs. 3–5 compare things.", " ".join(self.index.context("Figure 5")))
+
+    def test_describe(self):
+        description = self.index.describe("Figure 2")
+        self.assertTrue(description.startswith("Figure 2. Training curves."))
+        self.assertIn("Fig. 2b", description)
+        self.assertEqual(self.index.describe("Figure 9"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
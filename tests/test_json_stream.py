@@ -0,0 +1,75 @@
+import json
+import unittest
+
+from src.json_stream import ArrayItemStreamParser
+
+
+def feed_by_character(text, array_key="sections"):
+    """Feed ``text`` one character at a time, recording where each item is emitted."""
+    parser = ArrayItemStreamParser(array_key)
+    emitted = []
+    for position, char in enumerate(text):
+        for item in parser.feed(char):
+            emitted.append((position, item))
+    return emitted
+
+
+class ArrayItemStreamParserTest(unittest.TestCase):
+    def test_items_are_emitted_when_they_close(self):
+        document = {"title": "Paper", "sections": [{"title": "A", "points": [1, 2]}, {"title": "B"}]}
+        text = json.dumps(document)
+        emitted = feed_by_character(text)
+
+        self.assertEqual([item for _, item in emitted], document["sections"])
+        first_end = text.index("]}") + 1
+        self.assertEqual(emitted[0][0], first_end)
+        self.assertLess(emitted[1][0], len(text) - 1)
+
+    def test_braces_and_quotes_inside_strings(self):
+        document = {"title": "x } ] {", "sections": [
+            {"title": "Braces {like} [these]", "overview": "a \"quoted\" }, {\"title\": \"fake\"} \\"},
+            {"title": "Unicode é中", "overview": "]"},
+        ]}
+        emitted = feed_by_character(json.dumps(document))
+        self.assertEqual([item for _, item in emitted], document["sections"])
+
+    def test_nested_sections_key_is_ignored(self):
+        document = {"title": "Paper", "sections": [
+            {"title": "A", "sections": [{"title": "A.1"}], "content": [{"sections": []}]},
+        ]}
+        emitted = feed_by_character(json.dumps(document))
+        self.assertEqual([item for _, item in emitted], document["sections"])
+
+    def test_other_arrays_and_string_values_named_sections(self):
+        document = {"note": "sections", "figures": [{"title": "not a section"}], "sections": [{"title": "A"}]}
+        emitted = feed_by_character(json.dumps(document))
+        self.assertEqual([item for _, item in emitted], [{"title": "A"}])
+
+    def test_split_chunks_match_single_feed(self):
+        text = json.dumps({"title": "Paper", "sections": [{"title": "A \\ {"}, {"title": "B"}, {"title": "C"}]})
+        for size in (1, 2, 3, 5, 8, len(text)):
+            parser = ArrayItemStreamParser("sections")
+            items = []
+            for start in range(0, len(text), size):
+                items.extend(parser.feed(text[start:start + size]))
+            self.assertEqual([item["title"] for item in items], ["A \\ {", "B", "C"], size)
+
+    def test_item_with_trailing_comma_is_repaired(self):
+        text = '{"title": "Paper", "sections": [{"title": "A"}, {"title": "B", "points": ["x",],}, {"title": "C"}]}'
+        emitted = feed_by_character(text)
+        self.assertEqual([item["title"] for _, item in emitted], ["A", "B", "C"])
+        self.assertEqual(emitted[1][1]["points"], ["x"])
+
+    def test_unparsable_item_is_skipped(self):
+        text = '{"sections": [{"title": "A"}, {"title": "B", "overview": nope}, {"title": "C"}]}'
+        emitted = feed_by_character(text)
+        self.assertEqual([item["title"] for _, item in emitted], ["A", "C"])
+
+    def test_truncated_item_is_not_emitted(self):
+        text = '{"sections": [{"title": "A"}, {"title": "B", "overview": "cut off mid-sent'
+        emitted = feed_by_character(text)
+        self.assertEqual([item["title"] for _, item in emitted], ["A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from types import SimpleNamespace
+
+from src.llm_backends import OpenAIBackend
+
+
+class StubStream:
+    """Stands in for the openai ``Stream``: iterable chunks and a ``close`` for the connection."""
+
+    def __init__(self, deltas):
+        self.chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=d))])
+                       for d in deltas]
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if self.closed:
+                raise RuntimeError("read from a closed stream")
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.closed = True
+
+
+class StubClient:
+    """Minimal ``openai.OpenAI`` replacement serving one streamed completion."""
+
+    def __init__(self, deltas):
+        self.stream = StubStream(deltas)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, stream=False, **arguments):
+        return self.stream
+
+
+def openai_backend(deltas):
+    backend = OpenAIBackend.__new__(OpenAIBackend)
+    backend.client = StubClient(deltas)
+    return backend
+
+
+class OpenAIBackendTest(unittest.TestCase):
+    def test_stream_is_closed_when_exhausted(self):
+        backend = openai_backend(["a", "", "b"])
+        self.assertEqual(list(backend.stream_chat([], "model", 0)), ["a", "b"])
+        self.assertTrue(backend.client.stream.closed)
+
+    def test_stream_is_closed_when_the_caller_stops(self):
+        backend = openai_backend(["a", "b", "c"])
+        deltas = backend.stream_chat([], "model", 0)
+        self.assertEqual(next(deltas), "a")
+        self.assertFalse(backend.client.stream.closed)
+
+        deltas.close()
+        self.assertTrue(backend.client.stream.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
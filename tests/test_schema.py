@@ -0,0 +1,87 @@
+import json
+import unittest
+
+from src.schema import (_truncation_candidates, is_truncated, loads_repaired, validate_analysis,
+                        validate_analysis_section)
+
+ANALYSIS = {
+    "title": "Paper {with} \"braces\"",
+    "sections": [
+        {"title": "Introduction", "overview": "Sets up [the] problem, briefly.",
+         "content": [{"subtitle": "Motivation", "key_points": [{"argument": "A, B and C"}]}]},
+        {"title": "Results", "overview": "Numbers: 0.93, 0.87.",
+         "content": [{"figures": [{"reference": "Figure 2", "description": "Latency {ms}"}]}]},
+    ],
+}
+
+
+def strings(value):
+    """Yield every string key and value in a parsed JSON document."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield key
+            yield from strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from strings(item)
+
+
+class LoadsRepairedTest(unittest.TestCase):
+    def test_valid_json_is_unchanged(self):
+        text = json.dumps(ANALYSIS)
+        self.assertEqual(loads_repaired(text), ANALYSIS)
+        self.assertFalse(is_truncated(text))
+
+    def test_fences_prose_and_trailing_commas(self):
+        text = 'Here is the JSON:\n```json\n{"title": "T", "sections": [{"title": "A",},],}\n```'
+        self.assertEqual(loads_repaired(text), {"title": "T", "sections": [{"title": "A"}]})
+        self.assertFalse(is_truncated(text))
+
+    def test_commas_inside_strings_are_kept(self):
+        text = '{"title": "a,}", "sections": [],}'
+        self.assertEqual(loads_repaired(text), {"title": "a,}", "sections": []})
+
+    def test_every_truncation_point_yields_complete_values(self):
+        text = json.dumps(ANALYSIS)
+        complete = set(strings(ANALYSIS))
+        for end in range(1, len(text)):
+            prefix = text[:end]
+            self.assertTrue(is_truncated(prefix), prefix)
+            try:
+                value = loads_repaired(prefix)
+            except json.JSONDecodeError:
+                continue
+            # No half-written string may survive the repair
+            self.assertTrue(set(strings(value)) <= complete, prefix)
+            if isinstance(value, dict):
+                sections = value.get("sections", [])
+                self.assertEqual(validate_analysis({"title": "t", "sections": sections}), [], prefix)
+
+    def test_cut_off_string_is_dropped_not_closed(self):
+        value = loads_repaired('{"title": "B", "overview": "This section is cut off mid-sent')
+        self.assertEqual(value, {"title": "B"})
+
+    def test_half_written_object_is_dropped(self):
+        value = loads_repaired('{"title": "T", "sections": [{"title": "A"}, {"title": "B", "content": [{')
+        self.assertEqual(value["sections"][0], {"title": "A"})
+        self.assertTrue(all(validate_analysis_section(s) == [] for s in value["sections"]))
+
+    def test_truncation_repair_can_be_disabled(self):
+        with self.assertRaises(json.JSONDecodeError):
+            loads_repaired('{"title": "A", "overview": nope}', max_attempts=0)
+
+    def test_candidates_close_open_containers(self):
+        candidates = _truncation_candidates('{"a": [1, 2')
+        self.assertEqual(candidates[0], '{"a": [1, 2]}')
+        self.assertIn('{"a": [1]}', candidates)
+        self.assertEqual(_truncation_candidates('{"a": "open')[0], '{}')
+
+    def test_unrepairable_text_raises(self):
+        with self.assertRaises(json.JSONDecodeError):
+            loads_repaired("no json here")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from unittest import mock
+
+from src.service import ConversionRequestHandler, JobManager
+
+
+class StubJobs:
+    """Replaces ``_run_job``: records each call and finishes when released."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, input_path, job_dir, output_filename, cleanup_figures=False, options=None):
+        self.calls.append({"input_path": input_path, "output_filename": output_filename, "options": options})
+        self.release.wait(5)
+        if input_path.endswith("broken.pdf"):
+            raise ValueError("Not a PDF")
+        output_path = os.path.join(job_dir, output_filename)
+        with open(output_path, "wb") as f:
+            f.write(b"pptx")
+        return output_path
+
+
+class ServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = JobManager(self.tmp.name, workers=1)
+        # Jobs run in a thread against a stub instead of in warm worker processes
+        self.manager._executor.shutdown()
+        self.manager._executor = ThreadPoolExecutor(max_workers=1)
+        self.run_job = StubJobs()
+        patcher = mock.patch("src.service._run_job", self.run_job)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ConversionRequestHandler)
+        self.server.job_manager = self.manager
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.run_job.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.manager.shutdown()
+        self.tmp.cleanup()
+
+    def request(self, method, path, body=None, headers=None):
+        connection = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+        try:
+            connection.request(method, path, body, headers or {})
+            response = connection.getresponse()
+            data = response.read()
+        finally:
+            connection.close()
+        if response.getheader("Content-Type") == "application/json":
+            data = json.loads(data)
+        return response.status, data
+
+    def wait_for(self, job_id, status):
+        for _ in range(500):
+            job = self.manager.status(job_id)
+            if job["status"] == status:
+                return job
+            time.sleep(0.01)
+        self.fail(f"Job {job_id} never became {status}: {job}")
+
+    def test_routing(self):
+        self.assertEqual(self.request("GET", "/health"), (200, {"status": "ok", "workers": 1}))
+        self.assertEqual(self.request("GET", "/nowhere")[0], 404)
+        self.assertEqual(self.request("GET", "/jobs/unknown")[0], 404)
+        self.assertEqual(self.request("POST", "/health", b"{}")[0], 404)
+        self.assertEqual(self.request("DELETE", "/jobs/unknown")[0], 404)
+
+    def test_bad_json_bodies_are_rejected(self):
+        for body in (b"[1, 2]", b'"paper.pdf"', b"{not json", b"{}", b'{"input_path": ""}',
+                     b'{"input_path": "paper.pdf", "pages": "3-1"}'):
+            status, response = self.request("POST", "/jobs", body)
+            self.assertEqual(status, 400, body)
+            self.assertIn("error", response)
+        self.assertEqual(self.run_job.calls, [])
+
+    def test_json_job_runs_until_done(self):
+        status, job = self.request("POST", "/jobs", json.dumps(
+            {"input_path": "paper.pdf", "pages": "3-7", "sections": ["Results"], "figures": "2, 4"}
+        ))
+        self.assertEqual(status, 202)
+        self.assertIn(job["status"], ("queued", "running"))
+        self.wait_for(job["job_id"], "running")
+        self.assertEqual(self.request("GET", f"/jobs/{job['job_id']}/presentation")[0], 409)
+
+        self.run_job.release.set()
+        done = self.wait_for(job["job_id"], "done")
+        self.assertEqual(self.run_job.calls, [{
+            "input_path": "paper.pdf",
+            "output_filename": "paper_presentation.pptx",
+            "options": {"pages": [(3, 7)], "sections": ["Results"], "figures": ["2", "4"]},
+        }])
+        self.assertEqual(self.request("GET", f"/jobs/{job['job_id']}"), (200, done))
+        self.assertEqual(self.request("GET", f"/jobs/{job['job_id']}/presentation"), (200, b"pptx"))
+
+    def test_upload_takes_options_from_the_query(self):
+        status, job = self.request("POST", "/jobs?pages=1-4&figures=1,2", b"%PDF-1.4 upload",
+                                   {"Content-Type": "application/pdf"})
+        self.assertEqual(status, 202)
+
+        self.run_job.release.set()
+        self.wait_for(job["job_id"], "done")
+        call = self.run_job.calls[0]
+        self.assertEqual(call["options"], {"pages": [(1, 4)], "figures": ["1", "2"]})
+        self.assertEqual(call["output_filename"], "presentation.pptx")
+        with open(call["input_path"], "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4 upload")
+
+    def test_failed_job_reports_its_error(self):
+        job = self.manager.submit(self.manager.new_job_id(), "broken.pdf")
+        self.run_job.release.set()
+
+        failed = self.wait_for(job["job_id"], "failed")
+        self.assertEqual(failed["error"], "Not a PDF")
+        self.assertIsNotNone(failed["finished_at"])
+
+    def test_delete_cancels_queued_and_keeps_running_jobs(self):
+        running = self.manager.submit(self.manager.new_job_id(), "first.pdf")
+        queued = self.manager.submit(self.manager.new_job_id(), "second.pdf")
+        self.wait_for(running["job_id"], "running")
+
+        self.assertEqual(self.request("DELETE", f"/jobs/{running['job_id']}")[0], 409)
+        status, response = self.request("DELETE", f"/jobs/{queued['job_id']}")
+        self.assertEqual((status, response["status"]), (200, "cancelled"))
+        self.assertIsNone(self.manager.status(queued["job_id"]))
+        self.assertFalse(os.path.exists(self.manager.job_dir(queued["job_id"])))
+
+        self.run_job.release.set()
+        self.wait_for(running["job_id"], "done")
+        self.assertEqual(self.request("DELETE", f"/jobs/{running['job_id']}")[0], 200)
+        self.assertFalse(os.path.exists(self.manager.job_dir(running["job_id"])))
+        self.assertEqual([c["input_path"] for c in self.run_job.calls], ["first.pdf"])
+
+    def test_expired_jobs_are_pruned(self):
+        self.run_job.release.set()
+        old = self.manager.submit(self.manager.new_job_id(), "old.pdf")
+        self.wait_for(old["job_id"], "done")
+        stale_dir = self.manager.job_dir("left-over-from-a-previous-run")
+        os.makedirs(stale_dir)
+        os.utime(stale_dir, (0, 0))
+
+        self.manager.job_ttl = 60
+        self.manager._jobs[old["job_id"]]["finished_at"] -= 120
+        new = self.manager.submit(self.manager.new_job_id(), "new.pdf")
+
+        self.assertIsNone(self.manager.status(old["job_id"]))
+        self.assertFalse(os.path.exists(self.manager.job_dir(old["job_id"])))
+        self.assertFalse(os.path.exists(stale_dir))
+        self.assertIsNotNone(self.manager.status(new["job_id"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
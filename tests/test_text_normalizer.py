@@ -0,0 +1,86 @@
+import unittest
+
+from src.text_normalizer import normalize_pages
+
+BODY = "The method is evaluated on three benchmarks and compared against strong baselines."
+
+
+def page(number, body, table=""):
+    """A page with a running header, a body, an optional table and a page-number footer."""
+    return f"Streaming Slides for Papers\n{body}\n{table}\n{number}"
+
+
+class NormalizePagesTest(unittest.TestCase):
+    def test_running_headers_and_page_numbers_are_removed(self):
+        pages = [page(number, f"{BODY} Page {number} text.") for number in range(1, 6)]
+        text, report = normalize_pages(pages)
+
+        self.assertNotIn("Streaming Slides for Papers", text)
+        self.assertEqual(text.count(BODY), 5)
+        self.assertEqual(report["furniture_lines_removed"], 10)
+        self.assertGreater(report["tokens_saved"], 0)
+
+    def test_repeated_numeric_table_rows_are_kept(self):
+        table = "0.93 0.87 0.91\n12.4 11.8 13.0"
+        pages = [page(number, BODY, table) for number in range(1, 6)]
+        text, _ = normalize_pages(pages, edge_lines=4)
+
+        self.assertEqual(text.count("0.93 0.87 0.91"), 5)
+        self.assertEqual(text.count("12.4 11.8 13.0"), 5)
+
+    def test_repeated_captions_are_kept(self):
+        pages = [f"Figure 1: Overview.\n{BODY}\nTable 2: Results." for _ in range(5)]
+        text, _ = normalize_pages(pages)
+
+        self.assertEqual(text.count("Figure 1: Overview."), 5)
+        self.assertEqual(text.count("Table 2: Results."), 5)
+
+    def test_affiliations_before_the_abstract_are_removed(self):
+        pages = ["Streaming Slides\nJane Doe\nDepartment of Computing, Example University\njane@example.org\n"
+                 f"Abstract\n{BODY}"]
+        text, report = normalize_pages(pages)
+
+        self.assertNotIn("example.org", text)
+        self.assertIn("Jane Doe", text)
+        self.assertEqual(report["affiliation_lines_removed"], 2)
+
+    def test_references_are_cut_and_lettered_appendix_kept(self):
+        body = "\n".join([BODY] * 10)
+        pages = [f"1 Introduction\n{body}",
+                 "References\nA. Smith and B. Jones. A survey of slides. 2020.\nC. Lee. Streaming. 2021.",
+                 "A Proofs\nThe proof follows from the lemma.\nB Additional Results\nMore numbers."]
+        text, report = normalize_pages(pages)
+
+        self.assertNotIn("A survey of slides", text)
+        self.assertIn("A Proofs\nThe proof follows from the lemma.", text)
+        self.assertIn("B Additional Results", text)
+        self.assertGreater(report["reference_chars_removed"], 0)
+
+    def test_references_are_cut_before_named_appendix(self):
+        body = "\n".join([BODY] * 10)
+        pages = [body + "\nReferences\nA. Smith. A survey. 2020.\nAppendix A: Proofs\nThe proof."]
+        text, _ = normalize_pages(pages)
+
+        self.assertNotIn("A survey", text)
+        self.assertIn("Appendix A: Proofs", text)
+
+    def test_references_at_the_end_are_cut(self):
+        pages = ["\n".join([BODY] * 10) + "\nReferences\nA. Smith. A survey. 2020."]
+        text, _ = normalize_pages(pages)
+
+        self.assertTrue(text.rstrip().endswith(BODY))
+
+    def test_hyphenation_joins_only_words_seen_elsewhere(self):
+        pages = ["We use a self-\nsupervised, data-\ndriven and state-of-\nthe-art method with hyphen-\n"
+                 "ated words. Words are often hyphenated by the typesetter."]
+        text, report = normalize_pages(pages)
+
+        self.assertIn("self-supervised", text)
+        self.assertIn("data-driven", text)
+        self.assertIn("state-of-the-art", text)
+        self.assertIn("with hyphenated words", text)
+        self.assertEqual(report["hyphenations_joined"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
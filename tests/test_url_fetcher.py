@@ -0,0 +1,74 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.url_fetcher import URLFetcher
+
+PDF_BYTES = b"%PDF-1.4\n" + b"0" * 200_000 + b"\n%%EOF\n"
+ETAG = '"v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        if self.path.startswith("/paper.pdf"):
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body, content_type = PDF_BYTES, "application/pdf"
+        else:
+            body, content_type = b"<html><body>Not found</body></html>", "text/html"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class URLFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache_dir.cleanup()
+
+    def test_fresh_cache_skips_request(self):
+        fetcher = URLFetcher(self.cache_dir.name)
+        self.assertEqual(fetcher.fetch(f"{self.base_url}/paper.pdf"), PDF_BYTES)
+        self.assertEqual(fetcher.fetch(f"{self.base_url}/paper.pdf"), PDF_BYTES)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_revalidates_with_etag(self):
+        fetcher = URLFetcher(self.cache_dir.name, max_age=0, chunk_size=4096)
+        url = f"{self.base_url}/paper.pdf"
+        self.assertEqual(fetcher.fetch(url), PDF_BYTES)
+        self.assertEqual(fetcher.fetch(url), PDF_BYTES)
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertNotIn("If-None-Match", self.server.requests[0][1])
+        self.assertEqual(self.server.requests[1][1].get("If-None-Match"), ETAG)
+        self.assertEqual(len(os.listdir(fetcher.objects_dir)), 1)
+
+    def test_non_pdf_response_is_not_cached(self):
+        fetcher = URLFetcher(self.cache_dir.name)
+        with self.assertRaises(ValueError):
+            fetcher.fetch(f"{self.base_url}/error.html")
+        self.assertEqual(os.listdir(fetcher.objects_dir), [])
+        self.assertEqual(os.listdir(fetcher.index_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from src.utils import format_page_ranges, parse_page_ranges, resolve_pages, split_list
+
+
+class PageRangesTest(unittest.TestCase):
+    def test_parse_page_ranges(self):
+        self.assertEqual(parse_page_ranges("1-3,7,10-"), [(1, 3), (7, 7), (10, None)])
+        self.assertEqual(parse_page_ranges(" 2 , -4 ,"), [(2, 2), (1, 4)])
+
+    def test_parse_page_ranges_rejects_bad_input(self):
+        for spec in ("", ",", "a", "0", "3-1", "1-b", "2-3-4"):
+            with self.assertRaises(ValueError, msg=spec):
+                parse_page_ranges(spec)
+
+    def test_resolve_pages(self):
+        self.assertEqual(resolve_pages([(1, 3), (2, 4), (10, None)], 12), [0, 1, 2, 3, 9, 10, 11])
+        # Pages past the end are ignored
+        self.assertEqual(resolve_pages([(4, 20)], 5), [3, 4])
+
+    def test_resolve_pages_past_the_end_raises(self):
+        with self.assertRaises(ValueError) as raised:
+            resolve_pages([(12, 14), (20, None)], 10)
+        self.assertIn("12-14,20-end", str(raised.exception))
+        self.assertIn("10 pages", str(raised.exception))
+
+    def test_format_page_ranges(self):
+        self.assertEqual(format_page_ranges([(1, 3), (7, 7), (10, None)]), "1-3_7_10-end")
+        self.assertEqual(format_page_ranges(parse_page_ranges("5")), "5")
+
+    def test_split_list(self):
+        self.assertIsNone(split_list(None))
+        self.assertEqual(split_list(" methods, ,results "), ["methods", "results"])
+        self.assertEqual(split_list(""), [])
+
+
+if __name__ == "__main__":
+    unittest.main()